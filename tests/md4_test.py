@@ -1,5 +1,6 @@
 from todo_project_name.md4 import MD4
 import os
+from hypothesis import given, strategies as st
 import pytest
 
 # test cases from the paper
@@ -74,6 +75,48 @@ def test_md4_file():
 
     for filename, md4sum in zip(filenames, md4sums):
         assert MD4.from_file(filename).string_digest() == md4sum
+        assert MD4.from_file(filename, mmap=True).string_digest() == md4sum
+
+
+@given(st.binary(max_size=300), st.lists(st.integers(0, 300)))
+def test_md4_update(message, cuts):
+    md = MD4()
+    for start, stop in zip([0] + sorted(cuts), sorted(cuts) + [len(message)]):
+        md.update(message[start:stop])
+        # reading the digest must not affect the running computation
+        assert md.digest == MD4.from_bytes(message[:stop]).digest
+    assert md.string_digest() == MD4.from_bytes(message).string_digest()
+
+
+def test_md4_copy():
+    md = MD4()
+    md.update(b"message ")
+    forked = md.copy()
+    md.update(b"digest")
+    forked.update(b"of something else")
+    assert md.hexdigest() == MD4.from_bytes(b"message digest").hexdigest()
+    assert (
+        forked.hexdigest()
+        == MD4.from_bytes(b"message of something else").hexdigest()
+    )
+
+
+@given(
+    st.lists(st.integers(0, 0xFFFFFFFF), min_size=4, max_size=4),
+    st.lists(st.integers(0, 0xFFFFFFFF), min_size=16, max_size=16),
+)
+def test_md4_unrolled_update(registers, X):
+    unrolled, reference = MD4(), MD4()
+    for md in (unrolled, reference):
+        md._A, md._B, md._C, md._D = registers
+    unrolled._update(X)
+    reference._update_reference(X)
+    assert (unrolled._A, unrolled._B, unrolled._C, unrolled._D) == (
+        reference._A,
+        reference._B,
+        reference._C,
+        reference._D,
+    )
 
 
 if __name__ == "__main__":
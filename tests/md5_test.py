@@ -1,5 +1,8 @@
+from todo_project_name.md4 import MD4
 from todo_project_name.md5 import MD5
 import os
+import threading
+from hypothesis import HealthCheck, given, settings, strategies as st
 import pytest
 
 # test cases from the paper
@@ -78,6 +81,167 @@ def test_md5_file():
 
     for filename, md5sum in zip(filenames, md5sums):
         assert MD5.from_file(filename).string_digest() == md5sum
+        assert MD5.from_file(filename, mmap=True).string_digest() == md5sum
+
+
+@given(st.binary(max_size=300), st.lists(st.integers(0, 300)))
+def test_md5_update(message, cuts):
+    md = MD5()
+    for start, stop in zip([0] + sorted(cuts), sorted(cuts) + [len(message)]):
+        md.update(message[start:stop])
+        # reading the digest must not affect the running computation
+        assert md.digest == MD5.from_bytes(message[:stop]).digest
+    assert md.string_digest() == MD5.from_bytes(message).string_digest()
+
+
+def test_md5_copy():
+    md = MD5()
+    md.update(b"message ")
+    forked = md.copy()
+    md.update(b"digest")
+    forked.update(b"of something else")
+    assert md.hexdigest() == MD5.from_bytes(b"message digest").hexdigest()
+    assert (
+        forked.hexdigest()
+        == MD5.from_bytes(b"message of something else").hexdigest()
+    )
+
+
+@given(
+    st.lists(st.integers(0, 0xFFFFFFFF), min_size=4, max_size=4),
+    st.lists(st.integers(0, 0xFFFFFFFF), min_size=16, max_size=16),
+)
+def test_md5_unrolled_update(registers, X):
+    unrolled, reference = MD5(), MD5()
+    for md in (unrolled, reference):
+        md._A, md._B, md._C, md._D = registers
+    unrolled._update(X)
+    reference._update_reference(X)
+    assert (unrolled._A, unrolled._B, unrolled._C, unrolled._D) == (
+        reference._A,
+        reference._B,
+        reference._C,
+        reference._D,
+    )
+
+
+def test_md5_buffer_types():
+    message = b"Lorem ipsum dolor sit amet, " * 10
+    expected = MD5.from_bytes(message).digest
+    assert MD5.from_bytes(bytearray(message)).digest == expected
+    assert MD5.from_bytes(memoryview(message)[::1]).digest == expected
+    chunks = (message[i : i + 100] for i in range(0, len(message), 100))
+    assert MD5(chunks).digest == expected
+
+
+# Reads may end at any position relative to block boundary, as well as at
+# the end of file.
+@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(st.binary(max_size=300), st.sampled_from([1, 55, 56, 63, 64, 65, 128]))
+def test_md5_file_buffer_size(tmp_path, message, buffer_size):
+    path = tmp_path / "message"
+    path.write_bytes(message)
+    md = MD5.from_file(str(path), buffer_size=buffer_size)
+    assert md.digest == MD5.from_bytes(message).digest
+
+
+@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(
+    st.binary(max_size=300),
+    st.integers(min_value=0, max_value=300),
+    st.integers(min_value=0, max_value=300),
+)
+def test_md5_file_range(tmp_path, message, offset, limit):
+    path = tmp_path / "message"
+    path.write_bytes(message)
+    md = MD5()
+    with open(path, "rb") as file:
+        file.seek(offset)
+        md.update_from_file(file, buffer_size=64, limit=limit)
+    expected = MD5.from_bytes(message[offset : offset + limit])
+    assert md.digest == expected.digest
+
+
+def test_md5_file_invalid_buffer_size():
+    filename = os.path.join(
+        os.path.dirname(__file__), "data", "md_test_file.txt"
+    )
+    with pytest.raises(ValueError):
+        MD5.from_file(filename, buffer_size=0)
+
+
+def test_md5_mmap_fallback(tmp_path):
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    assert (
+        MD5.from_file(str(empty), mmap=True).digest
+        == MD5.from_bytes(b"").digest
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_md5_mmap_pipe(tmp_path):
+    message = b"abcdefghijklmnopqrstuvwxyz" * 1000
+    pipe = tmp_path / "pipe"
+    os.mkfifo(pipe)
+
+    def write():
+        with open(pipe, "wb") as file:
+            file.write(message)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        md = MD5.from_file(str(pipe), mmap=True)
+    finally:
+        writer.join()
+    assert md.digest == MD5.from_bytes(message).digest
+
+
+@given(st.binary(max_size=300), st.binary(max_size=300))
+def test_md5_state(beginning, end):
+    md = MD5()
+    md.update(beginning)
+    state = md.export_state()
+    resumed = MD5.import_state(state)
+    assert resumed.bytes_processed == len(beginning)
+    resumed.update(end)
+    assert resumed.digest == MD5.from_bytes(beginning + end).digest
+
+
+def test_md5_invalid_state():
+    state = MD5.from_bytes(b"abc").export_state()
+    with pytest.raises(ValueError):
+        MD4.import_state(state)
+    with pytest.raises(ValueError):
+        MD5.import_state(state[:-1])
+    with pytest.raises(ValueError):
+        MD5.import_state(state[:10])
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_md5_file_resume(tmp_path, use_mmap):
+    message = bytes(range(256)) * 40
+    path = tmp_path / "message"
+    path.write_bytes(message)
+
+    states = []
+
+    def interrupt(md):
+        states.append(md.export_state())
+        if len(states) == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        MD5.from_file(
+            str(path), mmap=use_mmap, buffer_size=1000, checkpoint=interrupt
+        )
+    assert MD5.import_state(states[-1]).bytes_processed == 3000
+
+    md = MD5.from_file(
+        str(path), mmap=use_mmap, buffer_size=1000, state=states[-1]
+    )
+    assert md.digest == MD5.from_bytes(message).digest
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+# Built-in
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# First-party
+from todo_project_name import async_hash
+from todo_project_name.md4 import MD4
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+from hypothesis import given, strategies as st
+
+
+@given(st.lists(st.binary(max_size=100), max_size=20))
+def test_hash_stream_reader(chunks):
+    async def run():
+        reader = asyncio.StreamReader()
+        for chunk in chunks:
+            reader.feed_data(chunk)
+        reader.feed_eof()
+        return await async_hash.hash_stream(reader, MD5, batch_size=64)
+
+    md = asyncio.run(run())
+    assert md.digest == MD5.from_bytes(b"".join(chunks)).digest
+
+
+@given(st.lists(st.binary(max_size=100), max_size=20))
+def test_hash_stream_iterable(chunks):
+    async def generate():
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    md = asyncio.run(async_hash.hash_stream(generate(), batch_size=100))
+    assert md.digest == MD4.from_bytes(b"".join(chunks)).digest
+
+
+def test_hash_stream_process_pool():
+    data = os.urandom(5 << 20)
+
+    async def run(executor):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await async_hash.hash_stream(
+            reader, MD5, batch_size=1 << 20, executor=executor
+        )
+
+    with ProcessPoolExecutor(2) as executor:
+        md = asyncio.run(run(executor))
+    assert md.bytes_processed == len(data)
+    assert md.digest == MD5.from_bytes(data).digest
+
+
+def test_hash_stream_invalid_batch_size():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_eof()
+        await async_hash.hash_stream(reader, batch_size=0)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+# Built-in
+import os
+
+# First-party
+from todo_project_name import checksum
+from todo_project_name.md4 import MD4
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+
+
+def data_path(name: str) -> str:
+    return os.path.join(os.path.dirname(__file__), "data", name)
+
+
+@pytest.mark.parametrize("algorithm", [MD4, MD5])
+def test_hash_files(algorithm):
+    paths = [data_path("md_test_file.bin"), data_path("md_test_file.txt")]
+    results = list(checksum.hash_files(paths, algorithm, workers=2))
+    assert sorted(result.path for result in results) == sorted(paths)
+    for result in results:
+        assert result.error is None
+        assert result.value == algorithm.from_file(result.path).digest
+
+
+def test_hash_files_error(tmp_path):
+    missing = str(tmp_path / "missing")
+    paths = [missing, data_path("md_test_file.txt")]
+    results = {
+        result.path: result
+        for result in checksum.hash_files(paths, MD5, workers=2)
+    }
+    assert isinstance(results[missing].error, FileNotFoundError)
+    assert results[missing].value is None
+    # the failure doesn't stop hashing of other files
+    assert results[paths[1]].error is None
+    assert results[paths[1]].value == MD5.from_file(paths[1]).digest
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
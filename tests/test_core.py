@@ -11,6 +11,20 @@ import pytest
 from hypothesis import given, assume, strategies as st
 
 
+@given(st.lists(st.text(max_size=100), max_size=20))
+def test_md4_strings(messages):
+    pytest.importorskip("numpy")
+    expected = [core.md4_string(message) for message in messages]
+    assert core.md4_strings(messages) == expected
+
+
+@given(st.lists(st.text(max_size=100), max_size=20))
+def test_md5_strings(messages):
+    pytest.importorskip("numpy")
+    expected = [core.md5_string(message) for message in messages]
+    assert core.md5_strings(messages) == expected
+
+
 def main():
     pytest.main([__file__])
 
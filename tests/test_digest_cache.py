@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+# Built-in
+import os
+
+# First-party
+from todo_project_name import rsa
+from todo_project_name.digest_cache import DigestCache
+from todo_project_name.md4 import MD4
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        yield cache
+
+
+def test_cache_hit(tmp_path, cache):
+    path = tmp_path / "message"
+    path.write_bytes(b"abc" * 100)
+    expected = MD5.from_file(str(path)).digest
+    assert MD5.from_file(str(path), cache=cache).digest == expected
+
+    # checkpoint is called only if the file is read
+    reads = []
+    md = MD5.from_file(str(path), cache=cache, checkpoint=reads.append)
+    assert not reads
+    assert isinstance(md, MD5)
+    assert md.digest == expected
+    # cached object can be used to continue the computation
+    md.update(b"abc")
+    assert md.digest == MD5.from_bytes(b"abc" * 101).digest
+
+
+def test_cache_algorithms_separate(tmp_path, cache):
+    path = tmp_path / "message"
+    path.write_bytes(b"abc")
+    MD5.from_file(str(path), cache=cache)
+    assert cache.get(str(path), MD4) is None
+    assert MD4.from_file(str(path), cache=cache).digest == (
+        MD4.from_bytes(b"abc").digest
+    )
+
+
+def test_cache_invalidation(tmp_path, cache):
+    path = tmp_path / "message"
+    path.write_bytes(b"abc")
+    MD5.from_file(str(path), cache=cache)
+    path.write_bytes(b"abcd")
+    os.utime(path, ns=(0, 0))
+    assert cache.get(str(path), MD5) is None
+    assert MD5.from_file(str(path), cache=cache).digest == (
+        MD5.from_bytes(b"abcd").digest
+    )
+
+
+def test_cache_overwrite_with_restored_mtime(tmp_path, cache):
+    path = tmp_path / "message"
+    path.write_bytes(b"Lorem ipsum dolor sit amet" * 100)
+    keys = rsa.rsa_key_gen(128)
+    signature = rsa.rsa_sign_file(str(path), keys.private, MD5, cache=cache)
+
+    # overwrite in place with the same length and restore mtime
+    stat = os.stat(path)
+    with open(path, "r+b") as file:
+        file.write(b"X")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    assert os.stat(path).st_mtime_ns == stat.st_mtime_ns
+
+    assert cache.get(str(path), MD5) is None
+    assert not rsa.rsa_verify_file(
+        str(path), signature, keys.public, MD5, cache=cache
+    )
+
+
+def test_cache_eviction(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"message{i}")
+        paths[-1].write_bytes(bytes([i]))
+
+    with DigestCache(tmp_path / "cache.sqlite", max_entries=2) as cache:
+        for path in paths[:2]:
+            MD5.from_file(str(path), cache=cache)
+        assert cache.get(str(paths[0]), MD5) is not None  # now most recent
+        MD5.from_file(str(paths[2]), cache=cache)
+        assert cache.get(str(paths[1]), MD5) is None
+        assert cache.get(str(paths[0]), MD5) is not None
+        assert cache.get(str(paths[2]), MD5) is not None
+
+
+def test_rsa_file_with_cache(tmp_path, cache, monkeypatch):
+    path = tmp_path / "message"
+    path.write_bytes(b"Lorem ipsum dolor sit amet" * 100)
+    keys = rsa.rsa_key_gen(128)
+    signature = rsa.rsa_sign_file(str(path), keys.private, MD5, cache=cache)
+
+    monkeypatch.setattr(MD5, "update_from_file", None)
+    assert rsa.rsa_verify_file(
+        str(path), signature, keys.public, MD5, cache=cache
+    )
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
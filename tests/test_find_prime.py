@@ -19,6 +19,20 @@ class TestIsProbablePrime:
         expected = True
         assert actual == expected, "Primes have to pass the test."
 
+    @given(st.integers(min_value=2, max_value=1 << 40))
+    def test_on_small(self, candidate):
+        actual = find_prime.is_probable_prime(candidate)
+        expected = sp.isprime(candidate)
+        assert actual == expected
+
+    # Large composites without small factors reach Rabin-Miller test.
+    @settings(suppress_health_check=HealthCheck.all())
+    @given(st.integers(min_value=2, max_value=1 << 64))
+    def test_on_semiprime(self, number):
+        p = sp.nextprime(number + (1 << 16))
+        q = sp.nextprime(p)
+        assert not find_prime.is_probable_prime(int(p * q))
+
     @given(st.integers(max_value=1))
     def test_on_definite_false(self, candidate):
         actual = find_prime.is_probable_prime(candidate)
@@ -26,6 +40,87 @@ class TestIsProbablePrime:
         assert actual == expected
 
 
+class TestRabinMiller:
+    @given(
+        st.integers(min_value=1, max_value=1 << 64).map(lambda x: 2 * x + 1)
+    )
+    def test_exact_below_2_64(self, candidate):
+        assume(candidate < 1 << 64)
+        actual = find_prime._rabin_miller(candidate)
+        assert actual == sp.isprime(candidate)
+
+    # Strong pseudoprimes to several smallest prime bases.
+    @pytest.mark.parametrize(
+        "candidate",
+        [3215031751, 3825123056546413051, 318665857834031151167461],
+    )
+    def test_on_strong_pseudoprime(self, candidate):
+        assert not find_prime._rabin_miller(candidate)
+        assert not find_prime.is_probable_prime(candidate)
+
+    @settings(
+        suppress_health_check=HealthCheck.all(), deadline=None, max_examples=20
+    )
+    @given(
+        st.integers(min_value=64, max_value=1024),
+        st.integers(min_value=1, max_value=5),
+    )
+    def test_on_large_prime(self, n_bits, repeats):
+        prime = sp.randprime(1 << n_bits - 1, 1 << n_bits)
+        assert find_prime._rabin_miller(prime, repeats)
+        assert not find_prime._rabin_miller(prime * sp.nextprime(prime))
+
+    def test_rounds(self):
+        rounds = [find_prime._rounds(bits) for bits in range(1, 5000)]
+        assert rounds == sorted(rounds, reverse=True)
+        assert find_prime._rounds(1024) == 5
+        assert find_prime._rabin_miller_random(int(sp.nextprime(1 << 1023)))
+
+    @pytest.mark.parametrize("repeats", [0, -1])
+    def test_on_invalid_repeats(self, repeats):
+        with pytest.raises(ValueError):
+            find_prime._rabin_miller((1 << 127) - 1, repeats)
+
+    @pytest.mark.parametrize("candidate", [-3, 1, 4, 1 << 64])
+    def test_on_invalid_candidate(self, candidate):
+        with pytest.raises(ValueError):
+            find_prime._rabin_miller(candidate)
+
+
+class TestBailliePSW:
+    @given(
+        st.integers(min_value=1, max_value=1 << 80).map(lambda x: 2 * x + 1)
+    )
+    def test_against_sympy(self, candidate):
+        actual = find_prime._baillie_psw(candidate)
+        assert actual == sp.isprime(candidate)
+
+    # Strong pseudoprimes to base 2, strong Lucas pseudoprimes and squares.
+    @pytest.mark.parametrize(
+        "candidate", [2047, 3215031751, 5459, 5777, 10877, 9, 1194649]
+    )
+    def test_on_pseudoprime(self, candidate):
+        assert not find_prime._baillie_psw(candidate)
+
+    @settings(suppress_health_check=HealthCheck.all(), deadline=None)
+    @given(st.integers(min_value=2, max_value=1 << 512))
+    def test_is_probable_prime(self, number):
+        p = int(sp.nextprime(number + (1 << 16)))
+        assert find_prime.is_probable_prime(p, method="bpsw")
+        assert not find_prime.is_probable_prime(p * p, method="bpsw")
+
+    @pytest.mark.parametrize("candidate", [-3, 1, 4])
+    def test_on_invalid_candidate(self, candidate):
+        with pytest.raises(ValueError):
+            find_prime._baillie_psw(candidate)
+
+    def test_on_invalid_method(self):
+        with pytest.raises(ValueError):
+            find_prime.is_probable_prime(101, method="fermat")
+        with pytest.raises(ValueError):
+            find_prime.find_prime(64, method="fermat")
+
+
 class TestFindPrime:
     # We are required to generate 128-bit keys, this should be enough.
     # TODO: Check thoroughly when ePortal is working.
@@ -34,6 +129,11 @@ class TestFindPrime:
         found = find_prime.find_prime(n_bits)
         assert sp.isprime(found)
 
+    @given(st.integers(min_value=2, max_value=129))
+    def test_with_miller_rabin(self, n_bits):
+        found = find_prime.find_prime(n_bits, method="miller-rabin")
+        assert sp.isprime(found)
+
     @given(st.integers(min_value=2, max_value=129))
     def test_if_has_correct_number_of_bits(self, n_bits):
         found = find_prime.find_prime(n_bits)
@@ -44,6 +144,85 @@ class TestFindPrime:
         with pytest.raises(ValueError):
             find_prime.find_prime(n_bits)
 
+    @given(st.integers(min_value=3, max_value=129))
+    def test_coprime_to(self, n_bits):
+        found = find_prime.find_prime(n_bits, coprime_to=3)
+        assert sp.isprime(found)
+        assert (found - 1) % 3 != 0
+
+
+class TestSearchWindow:
+    @staticmethod
+    def fix_start(monkeypatch, start):
+        monkeypatch.setattr(find_prime.secrets, "randbits", lambda n: start)
+
+    @pytest.mark.parametrize("n_bits", [40, 80, 512])
+    def test_first_prime_in_window(self, monkeypatch, n_bits):
+        start = (1 << n_bits - 1) + 12345
+        self.fix_start(monkeypatch, start)
+        expected = sp.nextprime(start - 1)
+        assert expected < start + 2 * find_prime._SIEVE_WINDOW
+        for method in ["bpsw", "miller-rabin"]:
+            assert find_prime._search_window(n_bits, method) == expected
+
+    def test_no_prime_in_window(self, monkeypatch):
+        monkeypatch.setattr(find_prime, "_SIEVE_WINDOW", 4)
+        # odd `start` followed by at least 4 odd composites
+        start = (1 << 39) + 1
+        while sp.nextprime(start - 1) <= start + 6:
+            start += 2
+        self.fix_start(monkeypatch, start)
+        assert find_prime._search_window(40) is None
+
+    def test_window_truncated(self, monkeypatch):
+        # the last 20-bit prime is 2^20 - 3, and the next prime has 21 bits
+        self.fix_start(monkeypatch, (1 << 20) - 3)
+        assert find_prime._search_window(20) == (1 << 20) - 3
+        self.fix_start(monkeypatch, (1 << 20) - 1)
+        assert find_prime._search_window(20) is None
+
+    @pytest.mark.parametrize("n_bits", range(2, 13))
+    def test_all_starts_of_small_windows(self, monkeypatch, n_bits):
+        # windows of small numbers are close to the sieving primes
+        for start in range((1 << n_bits - 1) + 1, 1 << n_bits, 2):
+            self.fix_start(monkeypatch, start)
+            expected = sp.nextprime(start - 1)
+            if expected >= 1 << n_bits:
+                expected = None
+            assert find_prime._search_window(n_bits) == expected
+
+    def test_sieve_complete(self, monkeypatch):
+        def fail(candidate):
+            raise AssertionError("primality test shouldn't be run")
+
+        monkeypatch.setattr(find_prime, "_PRIMALITY_TESTS", {"bpsw": fail})
+        start = (1 << 31) + 11
+        self.fix_start(monkeypatch, start)
+        assert find_prime._search_window(32) == sp.nextprime(start - 1)
+
+
+class TestFindPrimes:
+    @pytest.mark.parametrize("n_bits", [4, 64, 256])
+    def test_if_distinct_primes(self, n_bits):
+        found = find_prime.find_primes(n_bits, 2, workers=2)
+        assert len(found) == 2
+        assert found[0] != found[1]
+        for prime in found:
+            assert sp.isprime(prime)
+            assert prime.bit_length() == n_bits
+
+    def test_coprime_to(self):
+        # about half of the primes p have p - 1 divisible by 3
+        found = find_prime.find_primes(64, 8, workers=2, coprime_to=3)
+        assert len(set(found)) == 8
+        for prime in found:
+            assert sp.isprime(prime)
+            assert (prime - 1) % 3 != 0
+
+    def test_on_invalid(self):
+        with pytest.raises(ValueError):
+            find_prime.find_primes(1, 2)
+
 
 def main():
     pytest.main([__file__])
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+# First-party
+from todo_project_name import key_pool, rsa
+from todo_project_name.key_pool import KeyPairPool
+
+# Third-party
+import pytest
+
+
+def assert_valid(key_pair: rsa.RSAKeyPair) -> None:
+    signature = rsa.rsa_sign("message", key_pair.private)
+    assert rsa.rsa_verify("message", signature, key_pair.public)
+
+
+def test_pool_is_filled_in_background():
+    with KeyPairPool([32, 64], capacity=3) as pool:
+        assert pool.wait_until_full(timeout=60)
+        assert pool.available(32) == 3
+        assert pool.available(64) == 3
+        key_pairs = [pool.get(64) for _ in range(3)]
+        for key_pair in key_pairs:
+            assert_valid(key_pair)
+        # all the key pairs are different
+        assert len({key_pair.public.modulus for key_pair in key_pairs}) == 3
+        # the queue is refilled after falling below the low-water mark
+        assert pool.wait_until_full(timeout=60)
+        assert pool.available(64) == 3
+
+
+def test_get_of_size_not_configured():
+    with KeyPairPool([32], capacity=1) as pool:
+        assert pool.available(64) == 0
+        key_pair = pool.get(64)
+        assert key_pair.public.modulus.bit_length() in (127, 128)
+        assert_valid(key_pair)
+
+
+def test_closed_pool():
+    pool = KeyPairPool([32], capacity=1)
+    pool.close()
+    assert_valid(pool.get(32))
+
+
+def test_sizes_refilled_in_turns(monkeypatch):
+    generated = []
+
+    def key_gen(N, workers=None):
+        generated.append(N)
+        return rsa.rsa_key_gen(N, workers)
+
+    monkeypatch.setattr(key_pool, "rsa_key_gen", key_gen)
+    with KeyPairPool([32, 48], capacity=3) as pool:
+        assert pool.wait_until_full(timeout=60)
+    assert generated == [32, 48] * 3
+
+
+def test_background_error(monkeypatch):
+    def key_gen(N, workers=None):
+        raise RuntimeError("failed")
+
+    monkeypatch.setattr(key_pool, "rsa_key_gen", key_gen)
+    with KeyPairPool([32], capacity=1) as pool:
+        with pytest.raises(RuntimeError):
+            pool.wait_until_full()
+        with pytest.raises(RuntimeError):
+            pool.get(32)
+
+
+@pytest.mark.parametrize("sizes", [[1], [32, 0], [-5]])
+def test_invalid_sizes(sizes):
+    with pytest.raises(ValueError):
+        KeyPairPool(sizes)
+
+
+@pytest.mark.parametrize("capacity, low_water", [(0, None), (2, 0), (2, 3)])
+def test_invalid_arguments(capacity, low_water):
+    with pytest.raises(ValueError):
+        KeyPairPool([32], capacity=capacity, low_water=low_water)
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+
+# Built-in
+import os
+import shutil
+import subprocess
+
+# First-party
+from todo_project_name import manifest
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / "a.txt").write_text("a")
+    (root / "sub" / "b.txt").write_text("b" * 1000)
+    (root / "sub" / "deeper" / "c.bin").write_bytes(bytes(range(256)))
+    return root
+
+
+def test_write_manifest(tree):
+    path = tree / "MD5SUMS"
+    failures = manifest.write_manifest(tree, path, workers=2)
+    assert failures == []
+    expected = "".join(
+        f"{MD5.from_file(str(tree / name)).string_digest()}  {name}\n"
+        for name in ["a.txt", "sub/b.txt", "sub/deeper/c.bin"]
+    )
+    assert path.read_text() == expected
+
+
+@pytest.mark.skipif(shutil.which("md5sum") is None, reason="requires md5sum")
+def test_manifest_md5sum_compatible(tree):
+    path = tree / "MD5SUMS"
+    manifest.write_manifest(tree, path, workers=2)
+    subprocess.run(
+        ["md5sum", "--check", "--quiet", "MD5SUMS"], cwd=tree, check=True
+    )
+
+
+def test_manifest_rehashes_only_changed(tree, monkeypatch):
+    path = tree.parent / "MD5SUMS"
+    manifest.write_manifest(tree, path, workers=2)
+
+    (tree / "sub" / "b.txt").write_text("changed")
+    (tree / "new.txt").write_text("new")
+    hashed = []
+    original = manifest.hash_files
+
+    def spy(paths, *args):
+        paths = list(paths)
+        hashed.extend(paths)
+        return original(paths, *args)
+
+    monkeypatch.setattr(manifest, "hash_files", spy)
+    manifest.write_manifest(tree, path, workers=2)
+    assert sorted(hashed) == sorted(
+        str(tree / name) for name in ["new.txt", os.path.join("sub", "b.txt")]
+    )
+    assert f"{MD5.from_bytes(b'changed').string_digest()}  sub/b.txt\n" in (
+        path.read_text()
+    )
+
+
+def test_manifest_failures(tree):
+    os.symlink(tree / "missing", tree / "broken")
+    failures = manifest.write_manifest(
+        tree, tree.parent / "MD5SUMS", workers=2
+    )
+    assert [failure.path for failure in failures] == [str(tree / "broken")]
+    assert "broken" not in (tree.parent / "MD5SUMS").read_text()
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
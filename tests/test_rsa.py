@@ -98,6 +98,174 @@ def test_rsa_verify():
         assert rsa.rsa_verify(message, signature, key.public, algorithm)
 
 
+@pytest.mark.parametrize("key_size", [32, 128, 512])
+def test_rsa_sign_crt(key_size):
+    key_pair = rsa.rsa_key_gen(key_size)
+    private = key_pair.private
+    assert private.p is not None and private.q is not None
+    legacy = rsa.RSAKeyPrivate(private.key, private.modulus)
+    for message in ["", "a", "qwerty"]:
+        signature = rsa.rsa_sign(message, private)
+        assert signature == rsa.rsa_sign(message, legacy)
+        assert rsa.rsa_verify(message, signature, key_pair.public)
+
+
+def test_rsa_private_key_factors(tmp_path):
+    key = rsa.rsa_key_gen(64).private
+    key.id = "key"
+    path = rsa.save_key(key, tmp_path / "key.private")
+    read = rsa.read_key(path, rsa.RSAKeyPrivate)
+    assert read == key
+    assert (read.p, read.q, read.id) == (key.p, key.q, key.id)
+    assert (read.d_p, read.d_q, read.q_inv) == (key.d_p, key.d_q, key.q_inv)
+
+    # files without factors are still supported
+    lines = path.read_text("utf8").splitlines()
+    legacy_path = tmp_path / "legacy.private"
+    legacy_path.write_text("\n".join(lines[:4] + lines[-1:]), "utf8")
+    legacy = rsa.read_key(legacy_path, rsa.RSAKeyPrivate)
+    assert legacy == key
+    assert legacy.p is None and legacy.q is None
+    assert rsa.rsa_sign("a", legacy) == rsa.rsa_sign("a", key)
+
+
+def test_rsa_private_key_invalid_factors():
+    with pytest.raises(ValueError):
+        rsa.RSAKeyPrivate(3, 35, p=5)
+    with pytest.raises(ValueError):
+        rsa.RSAKeyPrivate(3, 35, p=5, q=11)
+
+
+@pytest.mark.parametrize("public_exponent", [3, 65537, None])
+def test_rsa_key_gen_public_exponent(public_exponent):
+    for key_size in [32, 128]:
+        key_pair = rsa.rsa_key_gen(key_size, public_exponent=public_exponent)
+        if public_exponent is not None:
+            assert key_pair.public.key == public_exponent
+        signature = rsa.rsa_sign("message", key_pair.private)
+        assert rsa.rsa_verify("message", signature, key_pair.public)
+        assert not rsa.rsa_verify("massage", signature, key_pair.public)
+
+
+@pytest.mark.parametrize("public_exponent", [-3, 1, 2, 65536])
+def test_rsa_key_gen_invalid_public_exponent(public_exponent):
+    with pytest.raises(ValueError):
+        rsa.rsa_key_gen(32, public_exponent=public_exponent)
+
+
+@pytest.mark.parametrize("algorithm", [MD4, MD5])
+def test_rsa_verify_many(algorithm):
+    key_pair = rsa.rsa_key_gen(64)
+    messages = [str(number) for number in range(600)]
+    items = [
+        (message, rsa.rsa_sign(message, key_pair.private, algorithm))
+        for message in messages
+    ]
+    # invalid and malformed signatures
+    items[3] = (messages[3], items[4][1])
+    items[500] = (messages[500], "not a signature")
+    expected = [idx not in (3, 500) for idx in range(len(items))]
+
+    results = rsa.rsa_verify_many(
+        iter(items), key_pair.public, algorithm, workers=2
+    )
+    assert list(results) == expected
+    assert not rsa.rsa_verify_all(items, key_pair.public, algorithm, workers=2)
+    assert rsa.rsa_verify_all(
+        items[5:500], key_pair.public, algorithm, workers=2
+    )
+    assert rsa.rsa_verify_all([], key_pair.public, algorithm, workers=2)
+
+
+def test_rsa_verify_files(tmp_path):
+    key_pair = rsa.rsa_key_gen(64)
+    paths = []
+    for idx in range(5):
+        path = tmp_path / f"file{idx}"
+        path.write_bytes(bytes(idx * 1000))
+        paths.append(str(path))
+    items = [
+        (path, rsa.rsa_sign_file(path, key_pair.private)) for path in paths
+    ]
+    assert list(rsa.rsa_verify_files(items, key_pair.public, workers=2)) == [
+        True
+    ] * len(items)
+    assert rsa.rsa_verify_files_all(items, key_pair.public, workers=2)
+
+    # missing file and signature of other file
+    items[1] = (str(tmp_path / "missing"), items[1][1])
+    items[2] = (items[2][0], items[3][1])
+    assert list(rsa.rsa_verify_files(items, key_pair.public, workers=2)) == [
+        True,
+        False,
+        False,
+        True,
+        True,
+    ]
+    assert not rsa.rsa_verify_files_all(items, key_pair.public, workers=2)
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_rsa_sign_files(tmp_path, ordered):
+    key_pair = rsa.rsa_key_gen(64)
+    paths = []
+    for idx in range(20):
+        path = tmp_path / f"file{idx}"
+        path.write_bytes(bytes(idx * 1000))
+        paths.append(str(path))
+    results = list(
+        rsa.rsa_sign_files(
+            iter(paths), key_pair.private, MD5, workers=2, ordered=ordered
+        )
+    )
+    if ordered:
+        assert [result.path for result in results] == paths
+    assert sorted(result.path for result in results) == sorted(paths)
+    for result in results:
+        assert result.error is None
+        path, signature = result.path, result.value
+        assert signature == rsa.rsa_sign_file(path, key_pair.private, MD5)
+        assert rsa.rsa_verify_file(path, signature, key_pair.public, MD5)
+
+
+def test_rsa_sign_files_error(tmp_path):
+    key_pair = rsa.rsa_key_gen(64)
+    missing = str(tmp_path / "missing")
+    existing = tmp_path / "existing"
+    existing.write_bytes(b"abc")
+    paths = [missing, str(existing)]
+    results = list(
+        rsa.rsa_sign_files(paths, key_pair.private, workers=2, ordered=True)
+    )
+    assert [result.path for result in results] == paths
+    assert isinstance(results[0].error, FileNotFoundError)
+    assert results[0].value is None
+    # the failure doesn't stop signing of other files
+    assert results[1].error is None
+    assert results[1].value == rsa.rsa_sign_file(
+        str(existing), key_pair.private
+    )
+
+
+@pytest.mark.parametrize("algorithm", [MD4, MD5])
+def test_rsa_sign_digest(algorithm):
+    key_pair = rsa.rsa_key_gen(64)
+    for message in ["", "a", "qwerty"]:
+        digest = algorithm.from_bytes(message.encode("utf-8")).digest
+        signature = rsa.rsa_sign_digest(digest, key_pair.private)
+        assert signature == rsa.rsa_sign(message, key_pair.private, algorithm)
+        assert rsa.rsa_verify_digest(digest, signature, key_pair.public)
+        assert rsa.rsa_verify(message, signature, key_pair.public, algorithm)
+        other = algorithm.from_bytes(b"other").digest
+        assert not rsa.rsa_verify_digest(other, signature, key_pair.public)
+
+
+def test_rsa_key_gen_parallel():
+    key = rsa.rsa_key_gen(256, workers=2)
+    signature = rsa.rsa_sign("message", key.private)
+    assert rsa.rsa_verify("message", signature, key.public)
+
+
 def main():
     pytest.main([__file__])
 
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+
+# First-party
+from todo_project_name import tree_hash
+from todo_project_name.md4 import MD4
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+
+
+@pytest.mark.parametrize("algorithm", [MD4, MD5])
+@pytest.mark.parametrize("size", [0, 1, 1000, 1024, 5000])
+def test_tree_digest(tmp_path, algorithm, size):
+    data = bytes(i % 251 for i in range(size))
+    path = tmp_path / "file"
+    path.write_bytes(data)
+    tree = tree_hash.tree_digest(str(path), algorithm, 1024, workers=2)
+    leaves = [
+        algorithm.from_bytes(data[i : i + 1024]).digest
+        for i in range(0, max(size, 1), 1024)
+    ]
+    assert tree.leaves == leaves
+    assert tree.file_size == size
+    assert tree.digest == algorithm.from_bytes(b"".join(leaves)).digest
+
+
+def test_tree_digest_sidecar(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(bytes(5000))
+    tree = tree_hash.tree_digest(str(path), MD4, 1000, workers=2)
+    sidecar = tree_hash.save_tree_digest(tree, tmp_path / "file.tree")
+    assert tree_hash.read_tree_digest(sidecar) == tree
+
+
+def test_verify_tree_digest(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(bytes(5000))
+    tree = tree_hash.tree_digest(str(path), MD5, 1000, workers=2)
+    assert tree_hash.verify_tree_digest(str(path), tree, workers=2) == []
+
+    data = bytearray(5000)
+    data[2500] = 1
+    path.write_bytes(data + b"more")
+    assert tree_hash.verify_tree_digest(str(path), tree, workers=2) == [2, 5]
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
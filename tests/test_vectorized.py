@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+# First-party
+from todo_project_name import vectorized
+from todo_project_name.md4 import MD4
+from todo_project_name.md5 import MD5
+
+# Third-party
+import pytest
+from hypothesis import given, strategies as st
+
+pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize(
+    "many, algorithm", [(vectorized.md4_many, MD4), (vectorized.md5_many, MD5)]
+)
+@given(messages=st.lists(st.binary(max_size=200), max_size=20))
+def test_many(many, algorithm, messages):
+    expected = [algorithm.from_bytes(message).digest for message in messages]
+    assert many(messages) == expected
+
+
+@pytest.mark.parametrize(
+    "many, algorithm", [(vectorized.md4_many, MD4), (vectorized.md5_many, MD5)]
+)
+def test_many_padding_boundaries(many, algorithm):
+    messages = [b"x" * length for length in range(0, 200)]
+    expected = [algorithm.from_bytes(message).digest for message in messages]
+    assert many(messages) == expected
+
+
+def main():
+    pytest.main([__file__])
+
+
+if __name__ == "__main__":
+    main()
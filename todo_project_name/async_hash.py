@@ -0,0 +1,87 @@
+"""Hashing data arriving asynchronously, e.g. from network connections."""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Optional, Type, Union
+from .md4 import MD4
+from .md5 import MD5
+from .mdn import DEFAULT_BUFFER_SIZE, MDN, ReadableBuffer
+
+
+async def _chunks(
+    stream: Union[asyncio.StreamReader, AsyncIterable[bytes]], size: int
+) -> AsyncIterator[bytes]:
+    """Yield consecutive pieces of data from `stream` until it ends."""
+    if isinstance(stream, asyncio.StreamReader):
+        while chunk := await stream.read(size):
+            yield chunk
+    else:
+        async for chunk in stream:
+            yield chunk
+
+
+def _hash_batch(
+    algorithm: Type[Union[MD4, MD5]], state: bytes, batch: ReadableBuffer
+) -> bytes:
+    """Returns state of hash object exported as `state`, after it was fed
+    with `batch`. Run in the executor, which may be a process pool, so the
+    hash object is passed by its state rather than updated in place."""
+    md = algorithm.import_state(state)
+    md.update(batch)
+    return md.export_state()
+
+
+async def hash_stream(
+    stream: Union[asyncio.StreamReader, AsyncIterable[bytes]],
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    *,
+    batch_size: int = DEFAULT_BUFFER_SIZE,
+    executor: Optional[Executor] = None,
+) -> MDN:
+    """Compute message digest of all the data from `stream`, without blocking
+    the event loop.
+
+    Incoming data is collected into batches, which are hashed in `executor`,
+    while the next batch is being received. At most two batches are kept in
+    memory at once.
+
+    Parameters
+    ==========
+    stream
+    : `asyncio.StreamReader` or asynchronous iterable of `bytes`.
+
+    algorithm
+    : hash algorithm. Default: MD4.
+    Available algorithms: MD4, MD5.
+
+    batch_size
+    : number of bytes hashed at once. Must be positive. Bigger batches mean
+    less overhead, but longer time of single executor job. Default: 1 MiB.
+
+    executor
+    : executor in which hashing is run, either thread or process pool.
+    Default: default executor of the event loop.
+    """
+    if batch_size <= 0:
+        raise ValueError("`batch_size` must be positive.")
+    loop = asyncio.get_running_loop()
+    state = algorithm().export_state()
+    pending: Optional[asyncio.Future] = None
+    batch = bytearray()
+
+    async for chunk in _chunks(stream, batch_size):
+        batch += chunk
+        if len(batch) >= batch_size:
+            # batches must be hashed in order, so wait for the previous one
+            if pending is not None:
+                state = await pending
+            pending = loop.run_in_executor(
+                executor, _hash_batch, algorithm, state, batch
+            )
+            batch = bytearray()
+    if pending is not None:
+        state = await pending
+    state = await loop.run_in_executor(
+        executor, _hash_batch, algorithm, state, batch
+    )
+    return algorithm.import_state(state)
@@ -0,0 +1,79 @@
+"""Computing message digests of many files at once."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Generic, Iterable, Iterator, Optional, Type, TypeVar, Union
+from .md4 import MD4
+from .md5 import MD5
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class FileResult(Generic[T]):
+    """Result of processing single file, by functions which process many
+    files at once. Exactly one of `value` and `error` is not None.
+
+    Failure to process one file (e.g. it doesn't exist) doesn't stop the
+    others; it is reported in `error` instead.
+    """
+
+    path: str
+    value: Optional[T]
+    error: Optional[Exception] = None
+
+
+def _file_size(path: str) -> int:
+    """Returns size of file in bytes, or 0 if it cannot be determined."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _hash_file(path: str, algorithm: Type[Union[MD4, MD5]]) -> bytes:
+    """Returns message digest of file. Run in worker processes."""
+    return algorithm.from_file(path).digest
+
+
+def hash_files(
+    paths: Iterable[str],
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+) -> Iterator[FileResult[bytes]]:
+    """Compute message digests of many files in parallel.
+
+    Files are distributed among worker processes, largest first, so that
+    big files don't end up being hashed alone at the end. Results, with
+    message digests as values, are yielded in order of completion.
+
+    Parameters
+    ==========
+    paths
+    : paths to files to be hashed.
+
+    algorithm
+    : hash algorithm. Default: MD4.
+    Available algorithms: MD4, MD5.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    paths = sorted(paths, key=_file_size, reverse=True)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_hash_file, path, algorithm): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield FileResult(path, future.result())
+            except Exception as error:
+                yield FileResult(path, None, error)
+    finally:
+        # Don't wait for remaining files, if the caller stopped early.
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,165 @@
+"""Persistent cache of message digests of files."""
+
+import os
+import sqlite3
+import stat
+import time
+from pathlib import Path
+from typing import Optional, Tuple, Type, Union
+from .mdn import MDN, MDNVar
+
+
+def _file_key(file_stat: os.stat_result) -> Tuple[int, int, int, int, int]:
+    """Returns metadata of the file, which must stay the same for its cached
+    digest to be valid."""
+    return (
+        file_stat.st_size,
+        file_stat.st_mtime_ns,
+        file_stat.st_ctime_ns,
+        file_stat.st_dev,
+        file_stat.st_ino,
+    )
+
+
+class DigestCache:
+    """Cache of message digests of files, stored in SQLite database.
+
+    Entries are keyed by absolute path and algorithm, and are valid as long as
+    size, modification time, status change time, device and inode number of
+    the file stay the same. Status change time cannot be set by users, so
+    content overwritten with restored modification time is detected. When
+    the number of entries exceeds `max_entries`, least recently used ones are
+    removed.
+
+    Usage
+    =====
+    >>> with DigestCache("digests.sqlite") as cache:
+    ...     md = MD5.from_file("image.iso", cache=cache)  # computed
+    ...     md = MD5.from_file("image.iso", cache=cache)  # read from cache
+    """
+
+    def __init__(
+        self, path: Union[str, Path], max_entries: int = 100_000
+    ) -> None:
+        """Open the cache, creating the database if it doesn't exist.
+
+        Parameters
+        ==========
+        path
+        : path to the database file.
+
+        max_entries
+        : maximal number of cached digests. Must be positive.
+        """
+        if max_entries <= 0:
+            raise ValueError("`max_entries` must be positive.")
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS digests (
+                    path TEXT NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    ctime_ns INTEGER NOT NULL,
+                    device INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    state BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (path, algorithm)
+                )"""
+            )
+            self._connection.execute(
+                """CREATE INDEX IF NOT EXISTS digests_last_used
+                ON digests (last_used)"""
+            )
+
+    def __enter__(self) -> "DigestCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def get(self, filename: str, algorithm: Type[MDNVar]) -> Optional[MDNVar]:
+        """Returns hash object of file under given path, or None if there is
+        no valid entry in the cache.
+
+        Parameters
+        ==========
+        filename
+        : path to the file.
+
+        algorithm
+        : hash algorithm, e.g. MD4, MD5.
+        """
+        path = os.path.abspath(filename)
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._connection:
+            row = self._connection.execute(
+                """SELECT size, mtime_ns, ctime_ns, device, inode, state
+                FROM digests WHERE path = ? AND algorithm = ?""",
+                (path, algorithm.name),
+            ).fetchone()
+            if row is None:
+                return None
+            *metadata, state = row
+            if tuple(metadata) != _file_key(file_stat):
+                # The file has changed since it was hashed.
+                self._connection.execute(
+                    "DELETE FROM digests WHERE path = ? AND algorithm = ?",
+                    (path, algorithm.name),
+                )
+                return None
+            self._connection.execute(
+                """UPDATE digests SET last_used = ?
+                WHERE path = ? AND algorithm = ?""",
+                (time.time_ns(), path, algorithm.name),
+            )
+
+        return algorithm.import_state(state)
+
+    def put(self, filename: str, md: MDN, file_stat: os.stat_result) -> None:
+        """Store hash object of the whole file in the cache.
+
+        Parameters
+        ==========
+        filename
+        : path to the file.
+
+        md
+        : hash object, which was fed with the whole file.
+
+        file_stat
+        : result of `os.stat` of the file, taken before it was read.
+        """
+        if not stat.S_ISREG(file_stat.st_mode):
+            return
+        with self._connection:
+            self._connection.execute(
+                """INSERT OR REPLACE INTO digests
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    os.path.abspath(filename),
+                    md.name,
+                    *_file_key(file_stat),
+                    md.export_state(),
+                    time.time_ns(),
+                ),
+            )
+            # evict least recently used entries
+            self._connection.execute(
+                """DELETE FROM digests WHERE rowid IN (
+                    SELECT rowid FROM digests
+                    ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
@@ -1,124 +1,152 @@
+import math
+import multiprocessing
+import os
 import secrets
 import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.synchronize import Event
+from typing import Callable, Dict, List, Optional
+from bitarray import bitarray
 
+# Candidates are first divided by all the primes below this bound.
+_SMALL_PRIMES_BOUND = 1 << 16
 
-def is_probable_prime(candidate: int) -> bool:
+
+def _small_primes(bound: int) -> List[int]:
+    """Returns list of all the primes less than `bound`, found with sieve of
+    Eratosthenes."""
+    sieve = bytearray([1]) * bound
+    sieve[:2] = b"\x00\x00"
+    for number in range(2, math.isqrt(bound - 1) + 1):
+        if sieve[number]:
+            multiples = range(number * number, bound, number)
+            sieve[number * number :: number] = bytes(len(multiples))
+    return [number for number, is_prime in enumerate(sieve) if is_prime]
+
+
+def _products(numbers: List[int], bits: int) -> List[int]:
+    """Multiply consecutive `numbers` into products of about `bits` bits."""
+    products = []
+    product = 1
+    for number in numbers:
+        product *= number
+        if product.bit_length() >= bits:
+            products.append(product)
+            product = 1
+    if product > 1:
+        products.append(product)
+    return products
+
+
+_SMALL_PRIMES = _small_primes(_SMALL_PRIMES_BOUND)
+_SMALL_PRIMES_SET = frozenset(_SMALL_PRIMES)
+# Trial division by thousands of primes is done with one `math.gcd` per
+# product. Products of about 4096 bits turned out to be the fastest: small
+# factors are found early, and there are only a few dozens of products.
+_SMALL_PRIMES_PRODUCTS = _products(_SMALL_PRIMES, 4096)
+
+# Number of consecutive odd numbers searched for a prime by `find_prime` at
+# once. Average gap between `n`-bit primes is about 0.7 * n, so windows
+# usually contain primes even for keys of several thousands of bits.
+_SIEVE_WINDOW = 1 << 13
+
+
+# Strong probable prime test to all these bases is deterministic for numbers
+# less than 3.3 * 10^24, in particular for all 64-bit ones.
+_DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+_DETERMINISTIC_BOUND = 1 << 64
+
+# (minimal number of bits, number of Rabin-Miller rounds): for random
+# candidates of at least that many bits, these rounds give probability of
+# false positive result below 2^-80 (Damgard, Landrock, Pomerance), which is
+# the approach of FIPS 186-4, Appendix C.3. It doesn't hold for arbitrary
+# numbers, so it is used only when searching for primes.
+_ROUNDS_BY_BITS = (
+    (3747, 3),
+    (1345, 4),
+    (476, 5),
+    (400, 6),
+    (347, 7),
+    (308, 8),
+    (55, 27),
+    (0, 34),
+)
+
+
+def is_probable_prime(
+    candidate: int,
+    repeats: int = 30,
+    method: str = "miller-rabin",
+) -> bool:
     """Check if `candidate` is a probable prime.
 
+    Parameters
+    ==========
+    candidate
+    : tested integer.
+
+    repeats
+    : number of Rabin-Miller rounds, see `_rabin_miller`. Default: 30, so
+    probability of false positive result is less than 4^-30 for any
+    `candidate`, not only random one. Ignored by BPSW test.
+
+    method
+    : primality test run after trial division. Default: "miller-rabin".
+    Available methods: "miller-rabin", "bpsw".
+
     Notes
     =====
-    This function uses Rabin-Miller test under the hood.
+    This function uses trial division by small primes first, and Rabin-Miller
+    or Baillie-PSW test under the hood. The result is exact for numbers less
+    than 2^64.
     """
-    primes = {
-        2,
-        3,
-        5,
-        7,
-        11,
-        13,
-        17,
-        19,
-        23,
-        29,
-        31,
-        37,
-        41,
-        43,
-        47,
-        53,
-        59,
-        61,
-        67,
-        71,
-        73,
-        79,
-        83,
-        89,
-        97,
-        101,
-        103,
-        107,
-        109,
-        113,
-        127,
-        131,
-        137,
-        139,
-        149,
-        151,
-        157,
-        163,
-        167,
-        173,
-        179,
-        181,
-        191,
-        193,
-        197,
-        199,
-        211,
-        223,
-        227,
-        229,
-        233,
-        239,
-        241,
-        251,
-        257,
-        263,
-        269,
-        271,
-        277,
-        281,
-        283,
-        293,
-        307,
-        311,
-        313,
-        317,
-        331,
-        337,
-        347,
-        349,
-        353,
-        359,
-        367,
-        373,
-        379,
-        383,
-        389,
-        397,
-        401,
-        409,
-        419,
-        421,
-        431,
-        433,
-        439,
-        443,
-        449,
-        457,
-        461,
-        463,
-        467,
-        479,
-        487,
-        491,
-        499,
-        503,
-        509,
-    }
-    # Prime number cannot be less or equal to 1.
-    if candidate <= 1:
-        return False
-    if candidate <= 509:
-        if candidate in primes:
+    test = _primality_test(method)
+    # Small numbers, including ones less or equal to 1, are just looked up.
+    if candidate < _SMALL_PRIMES_BOUND:
+        return candidate in _SMALL_PRIMES_SET
+    for product in _SMALL_PRIMES_PRODUCTS:
+        if math.gcd(candidate, product) != 1:
+            return False
+    # There is no prime factor less than square root of the candidate.
+    if candidate < _SMALL_PRIMES_BOUND**2:
+        return True
+    if test is _rabin_miller:
+        return _rabin_miller(candidate=candidate, repeats=repeats)
+    return test(candidate)
+
+
+def _rounds(bits: int) -> int:
+    """Returns number of Rabin-Miller rounds for random `bits`-bit
+    candidates."""
+    for min_bits, rounds in _ROUNDS_BY_BITS:
+        if bits >= min_bits:
+            return rounds
+    raise AssertionError("unreachable")
+
+
+def _rabin_miller_random(candidate: int) -> bool:
+    """Return the result of Rabin-Miller test of randomly chosen `candidate`,
+    with number of rounds chosen by its number of bits. Probability of false
+    positive result is less than 2^-80."""
+    return _rabin_miller(candidate, _rounds(candidate.bit_length()))
+
+
+def _is_strong_probable_prime(
+    candidate: int, witness: int, m: int, d: int
+) -> bool:
+    """Returns True if `candidate` is a strong probable prime to base
+    `witness`, where candidate - 1 == m * 2^d and m is odd."""
+    x = pow(witness, m, candidate)
+    minus_one = candidate - 1
+    if x == 1 or x == minus_one:
+        return True
+    for _ in range(d - 1):
+        x = x * x % candidate
+        if x == minus_one:
             return True
-        return False
-    for number in primes:
-        if candidate % number == 0:
+        if x == 1:  # 1 has no other square roots modulo prime
             return False
-    return _rabin_miller(candidate=candidate)
+    return False
 
 
 def _rabin_miller(candidate: int, repeats: int = 30) -> bool:
@@ -132,9 +160,10 @@ def _rabin_miller(candidate: int, repeats: int = 30) -> bool:
     : tested natural number. Must be an odd natural number, greater than 2
 
     repeats
-    : number of witnesses taken into account. Ensures that probability of
-    false positive result is less than 4^(-repeats).
-    If repeats >= candidate-2, then repeats=candidate-2 is assumed.
+    : number of random witnesses taken into account. Ensures that
+    probability of false positive result is less than 4^(-repeats).
+    Candidates less than 2^64 are tested with fixed set of witnesses, which
+    gives exact result, so `repeats` is ignored for them.
     """
     if candidate % 2 == 0 or candidate <= 1:
         raise ValueError("`candidate` must be odd number greater than 2.")
@@ -142,39 +171,197 @@ def _rabin_miller(candidate: int, repeats: int = 30) -> bool:
     if repeats <= 0:
         raise ValueError("`repeats` must be positive.")
 
-    # Witnesses, number of which is specified by `repeats`, are generated
-    # from the interval containing no numbers greater, than `candidate`.
-    repeats = min(candidate - 2, repeats)
-
     # candidate-1==m*2^d for some positive integers m, d
-    n = candidate.bit_length()
     m = candidate - 1
-    for i in range(1, n):
-        m = m >> 1
-        if m & 1:
-            d = i
-            break
-    visited = []
+    d = (m & -m).bit_length() - 1
+    m >>= d
+
+    if candidate < _DETERMINISTIC_BOUND:
+        return all(
+            _is_strong_probable_prime(candidate, witness, m, d)
+            for witness in _DETERMINISTIC_BASES
+            if witness % candidate != 0
+        )
+
+    # Witnesses aren't deduplicated: for candidates that large, drawing the
+    # same one twice is extremely unlikely.
     for _ in range(repeats):
-        flag = False
-        # rand a witness in range 2, 3, ..., candidate-1
-        witness = random.randrange(2, candidate)
-        while witness in visited:
-            witness = random.randrange(2, candidate)
-        visited.append(witness)
-        tmp = pow(witness, m, candidate)
-        if (tmp - 1) % candidate == 0:
-            flag = True
-        for i in range(d):
-            if (tmp + 1) % candidate == 0:
-                flag = True
-            tmp = (tmp * tmp) % candidate
-        if flag is False:
+        # rand a witness in range 2, 3, ..., candidate-2
+        witness = random.randrange(2, candidate - 1)
+        if not _is_strong_probable_prime(candidate, witness, m, d):
             return False
     return True
 
 
-def find_prime(n: int) -> int:
+def _jacobi(a: int, n: int) -> int:
+    """Returns Jacobi symbol (a/n), for odd positive `n`."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _half(x: int, n: int) -> int:
+    """Returns x / 2 modulo odd `n`."""
+    x %= n
+    return (x + n if x & 1 else x) >> 1
+
+
+def _is_strong_lucas_probable_prime(candidate: int) -> bool:
+    """Returns True if odd `candidate` is a strong Lucas probable prime, with
+    parameters chosen by Selfridge's method A."""
+    if math.isqrt(candidate) ** 2 == candidate:
+        # there is no D with Jacobi symbol -1 for squares
+        return False
+    # first D of 5, -7, 9, -11, ... such that (D/candidate) == -1
+    D = 5
+    while (jacobi := _jacobi(D, candidate)) != -1:
+        if jacobi == 0 and abs(D) != candidate:
+            return False  # D has common factor with the candidate
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    # candidate+1==m*2^d for some positive integers m, d
+    m = candidate + 1
+    d = (m & -m).bit_length() - 1
+    m >>= d
+
+    # U_k, V_k and Q^k for k being the leading bits of `m`, starting with 1
+    U, V, Q_k = 1, P, Q % candidate
+    for bit in bin(m)[3:]:
+        U, V = U * V % candidate, (V * V - 2 * Q_k) % candidate
+        Q_k = Q_k * Q_k % candidate
+        if bit == "1":
+            U, V = _half(P * U + V, candidate), _half(D * U + P * V, candidate)
+            Q_k = Q_k * Q % candidate
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(d - 1):
+        V = (V * V - 2 * Q_k) % candidate
+        if V == 0:
+            return True
+        Q_k = Q_k * Q_k % candidate
+    return False
+
+
+def _baillie_psw(candidate: int) -> bool:
+    """Return the result of Baillie-PSW test.
+
+    Returns True if test has been passed, and returns False otherwise. The
+    test is strong probable prime test to base 2, followed by strong Lucas
+    probable prime test. No composite number passing it is known, and there
+    is none less than 2^64. It costs about as much as three rounds of
+    Rabin-Miller test.
+
+    Parameters
+    ==========
+    candidate
+    : tested natural number. Must be an odd natural number, greater than 2
+    """
+    if candidate % 2 == 0 or candidate <= 1:
+        raise ValueError("`candidate` must be odd number greater than 2.")
+
+    # candidate-1==m*2^d for some positive integers m, d
+    m = candidate - 1
+    d = (m & -m).bit_length() - 1
+    m >>= d
+    return _is_strong_probable_prime(
+        candidate, 2, m, d
+    ) and _is_strong_lucas_probable_prime(candidate)
+
+
+_PRIMALITY_TESTS: Dict[str, Callable[[int], bool]] = {
+    "miller-rabin": _rabin_miller,
+    "bpsw": _baillie_psw,
+}
+
+
+def _primality_test(method: str) -> Callable[[int], bool]:
+    """Returns primality test for odd numbers greater than 2 by its name."""
+    try:
+        return _PRIMALITY_TESTS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown method {method!r}. Available methods: "
+            + ", ".join(map(repr, _PRIMALITY_TESTS))
+        ) from None
+
+
+def _search_window(n: int, method: str = "bpsw") -> Optional[int]:
+    """Return `n`-bit probable prime from a window of consecutive odd numbers
+    starting at random one, or None if there is no prime in the window.
+
+    The window is sieved with small primes first, so primality test is run
+    only for numbers without small factors.
+
+    Parameters
+    ==========
+    `n`
+    : number of bits, must be greater than 1.
+
+    method
+    : primality test, see `is_probable_prime`.
+    """
+    test = _primality_test(method)
+    if test is _rabin_miller:
+        # candidates are random, so fewer rounds are enough
+        test = _rabin_miller_random
+    # Generate a number with `n` random bits, possibly with leading 0s,
+    start = secrets.randbits(n) | (
+        # therefore set first bit to 1,
+        1 << n - 1
+        # as well as last one, to make sure the number is odd (even
+        # numbers aren't primes).
+        | 1
+    )
+    # Candidates are start, start + 2, ..., as long as they have `n` bits.
+    size = min(_SIEVE_WINDOW, ((1 << n) - start + 1) // 2)
+    end = start + 2 * (size - 1)
+
+    composite = bitarray(size)
+    composite.setall(0)
+    for prime in _SMALL_PRIMES[1:]:  # candidates are odd, so skip 2
+        # every composite number in the window has factor <= sqrt(end)
+        if prime * prime > end:
+            break
+        # index of the first candidate divisible by `prime`:
+        # start + 2 * idx == 0 (mod prime), and (prime + 1) // 2 is 2^-1
+        # `prime` itself is never in the window: prime^2 <= end < 2^n, so it
+        # has less than `n` bits, while all the candidates have `n` bits
+        idx = -start * ((prime + 1) // 2) % prime
+        composite[idx::prime] = 1
+
+    # If all the primes up to sqrt(end) were used, survivors are primes.
+    sieve_complete = end < _SMALL_PRIMES_BOUND**2
+    for idx, is_composite in enumerate(composite):
+        if is_composite:
+            continue
+        candidate = start + 2 * idx
+        if sieve_complete or test(candidate):
+            return candidate
+    return None
+
+
+def _is_suitable(prime: Optional[int], coprime_to: Optional[int]) -> bool:
+    """Check if `prime` was found, and `prime` - 1 is coprime to
+    `coprime_to`, if given."""
+    return prime is not None and (
+        coprime_to is None or math.gcd(coprime_to, prime - 1) == 1
+    )
+
+
+def find_prime(
+    n: int, method: str = "bpsw", coprime_to: Optional[int] = None
+) -> int:
     """Return `n`-bit probable prime.
 
     Parameters
@@ -182,22 +369,114 @@ def find_prime(n: int) -> int:
     `n`
     : number of bits, must be greater than 1,
       because otherwise such a prime doesn't exist.
+
+    method
+    : primality test, see `is_probable_prime`. Default: "bpsw".
+
+    coprime_to
+    : if given, only primes p such that p - 1 is coprime to this number are
+    returned, e.g. RSA public exponent has to be invertible modulo p - 1.
+    Default: None.
+    """
+    if n <= 1:
+        raise ValueError("The number of bits must be greater than 1.")
+    _primality_test(method)
+
+    prime = _search_window(n, method)
+    while not _is_suitable(prime, coprime_to):
+        prime = _search_window(n, method)
+    assert prime is not None
+    return prime
+
+
+# Set in worker processes of `find_primes`, when no more primes are needed.
+_stop_event: Optional[Event] = None
+
+
+def _set_stop_event(event: Event) -> None:
+    """Initializer of worker processes of `find_primes`."""
+    global _stop_event
+    _stop_event = event
+
+
+def _search_until_stopped(
+    n: int, method: str, coprime_to: Optional[int]
+) -> Optional[int]:
+    """Return `n`-bit probable prime, or None if the search was stopped by
+    `find_primes`. Run in worker processes."""
+    assert _stop_event is not None
+    while not _stop_event.is_set():
+        prime = _search_window(n, method)
+        if _is_suitable(prime, coprime_to):
+            return prime
+    return None
+
+
+def find_primes(
+    n: int,
+    count: int,
+    workers: Optional[int] = None,
+    method: str = "bpsw",
+    coprime_to: Optional[int] = None,
+) -> List[int]:
+    """Return `count` distinct `n`-bit probable primes, searching for them in
+    parallel.
+
+    Each worker process searches independently, starting from its own random
+    numbers. The first primes found are returned, and the remaining searches
+    are stopped.
+
+    Parameters
+    ==========
+    `n`
+    : number of bits, must be greater than 1,
+      because otherwise such a prime doesn't exist.
+
+    count
+    : number of primes to be found. There must be that many `n`-bit primes.
+
+    workers
+    : number of worker processes. Default: number of processors.
+
+    method
+    : primality test, see `is_probable_prime`. Default: "bpsw".
+
+    coprime_to
+    : if given, only primes p such that p - 1 is coprime to this number are
+    returned. Primes are checked in worker processes. Default: None.
     """
     if n <= 1:
         raise ValueError("The number of bits must be greater than 1.")
+    _primality_test(method)
+    workers = workers or os.cpu_count() or 1
 
-    tested = set()
-    while True:
-        # Generate a number with `n` random bits, possibly with leading 0s,
-        candidate = secrets.randbits(n) | (
-            # therefore set first bit to 1,
-            1 << n - 1
-            # as well as last one, to make sure the number is odd (even
-            # numbers aren't primes).
-            | 1
-        )
-        if candidate in tested:
-            continue
-        if is_probable_prime(candidate):
-            return candidate
-        tested.add(candidate)
+    primes: List[int] = []
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(
+        workers, initializer=_set_stop_event, initargs=(stop,)
+    )
+    try:
+        pending = {
+            executor.submit(_search_until_stopped, n, method, coprime_to)
+            for _ in range(workers)
+        }
+        while len(primes) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prime = future.result()
+                if (
+                    prime is not None
+                    and prime not in primes
+                    and len(primes) < count
+                ):
+                    primes.append(prime)
+                # keep all the workers busy
+                pending.add(
+                    executor.submit(
+                        _search_until_stopped, n, method, coprime_to
+                    )
+                )
+    finally:
+        stop.set()
+        executor.shutdown(cancel_futures=True)
+    return primes
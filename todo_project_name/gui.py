@@ -9,6 +9,7 @@
 from copy import copy
 from enum import Enum, auto
 from pathlib import Path
+from typing import Optional
 import sys
 import logging
 from logging import debug
@@ -28,18 +29,28 @@ from PySide6.QtWidgets import (
     QFormLayout,
 )
 from todo_project_name import rsa
+from todo_project_name.key_pool import KeyPairPool
 
 from todo_project_name.md5 import MD5
 from todo_project_name.md4 import MD4
 
 
+# Size of generated keys, passed to `rsa.rsa_key_gen`.
+KEY_SIZE = 128
+
+
 def main():
     if len(sys.argv) > 1 and sys.argv[1] == "--debug":
         logging.basicConfig(level="DEBUG", handlers=[RichHandler()])
     application = QApplication()
-    main_window = MainWindow()
-    main_window.show()
-    status = application.exec()
+    # Key pairs generated in advance, so that KEYPAIR action is instant.
+    key_pool = KeyPairPool([KEY_SIZE], capacity=4)
+    try:
+        main_window = MainWindow(key_pool)
+        main_window.show()
+        status = application.exec()
+    finally:
+        key_pool.close()
     sys.exit(status)
 
 
@@ -142,11 +153,18 @@ class MainWindow(QWidget):
             case _:
                 raise ValueError(f"Unrecognized layout {layout}")
 
-    def __init__(self) -> None:
-        """Create a new instance."""
+    def __init__(self, key_pool: Optional[KeyPairPool] = None) -> None:
+        """Create a new instance.
+
+        Parameters
+        ==========
+        key_pool:
+            source of key pairs for KEYPAIR action. If None, key pairs are
+            generated on demand.
+        """
         super().__init__()
 
-        self.state = State(self)
+        self.state = State(self, key_pool)
         debug(f"Initial state: {self.state}")
 
         self._prepare_containers_and_layouts()
@@ -362,10 +380,13 @@ class State(QObject):
     keyIdChanged = Signal(str)
     signaturePathChanged = Signal(str)
 
-    def __init__(self, qt_parent) -> None:
+    def __init__(
+        self, qt_parent, key_pool: Optional[KeyPairPool] = None
+    ) -> None:
         """Create a new instance."""
         super().__init__()
         self.qt_parent = qt_parent
+        self.key_pool = key_pool
         self._reset()
 
     def _reset(self, **fields) -> None:
@@ -408,7 +429,7 @@ class State(QObject):
     def __copy__(self):
         """Return a copy of the object."""
         dummy = QWidget()
-        state = self.__class__(dummy)
+        state = self.__class__(dummy, self.key_pool)
         state.action = copy(self.action)
         state.algorithm = copy(self.algorithm)
         state.keypair_basename = copy(self.keypair_basename)
@@ -585,7 +606,10 @@ class State(QObject):
                     )
                     return
                 try:
-                    key_pair = rsa.rsa_key_gen(128)
+                    if self.key_pool is not None:
+                        key_pair = self.key_pool.get(KEY_SIZE)
+                    else:
+                        key_pair = rsa.rsa_key_gen(KEY_SIZE)
                     key_pair.private.id = self.key_id
                     key_pair.public.id = self.key_id
                     rsa.save_key(
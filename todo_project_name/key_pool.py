@@ -0,0 +1,163 @@
+"""Pool of RSA key pairs generated in advance."""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+from .rsa import RSAKeyPair, rsa_key_gen
+
+
+class KeyPairPool:
+    """Bounded queues of pre-generated RSA key pairs, one for each key size.
+
+    Key pairs are generated by a background thread. When the number of key
+    pairs of some size falls below `low_water`, the queue is refilled up to
+    `capacity`. Queues of different sizes are refilled in turns, one key pair
+    at a time. Key pairs of sizes which weren't configured, or which ran out,
+    are generated on demand. If generation in the background fails, the
+    error is raised by `get` and `wait_until_full`.
+
+    Usage
+    =====
+    >>> with KeyPairPool([128, 512], capacity=32) as pool:
+    ...     key_pair = pool.get(128)  # instant, if the pool had time to fill
+    """
+
+    def __init__(
+        self,
+        sizes: Iterable[int],
+        capacity: int = 16,
+        low_water: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        """Create the pool and start filling it in the background.
+
+        Parameters
+        ==========
+        sizes
+        : values of `N` passed to `rsa_key_gen`, for which key pairs are
+        generated in advance. Must be greater than 1.
+
+        capacity
+        : maximal number of key pairs of each size. Must be positive.
+
+        low_water
+        : number of key pairs of given size, below which the queue is
+        refilled. Must be between 1 and `capacity`. Default: half of
+        `capacity`, rounded up.
+
+        workers
+        : passed to `rsa_key_gen`. Default: None (primes are searched for in
+        the background thread).
+        """
+        sizes = list(sizes)
+        if any(N <= 1 for N in sizes):
+            raise ValueError("Sizes must be greater than 1.")
+        if capacity <= 0:
+            raise ValueError("`capacity` must be positive.")
+        if low_water is None:
+            low_water = (capacity + 1) // 2
+        if not 1 <= low_water <= capacity:
+            raise ValueError("`low_water` must be between 1 and `capacity`.")
+        self.capacity = capacity
+        self.low_water = low_water
+        self.workers = workers
+
+        self._queues: Dict[int, Deque[RSAKeyPair]] = {
+            size: deque() for size in sizes
+        }
+        # sizes whose queues fell below `low_water` and aren't full yet
+        self._refilling: List[int] = list(self._queues)
+        self._closed = False
+        # error which stopped the background thread
+        self._error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._refill, name="KeyPairPool", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "KeyPairPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the background thread, after it generates current key pair."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def available(self, N: int) -> int:
+        """Returns number of key pairs of size `N` ready to be taken."""
+        with self._condition:
+            queue = self._queues.get(N)
+            return len(queue) if queue is not None else 0
+
+    def wait_until_full(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all the queues are full. Returns False if `timeout`
+        (in seconds) has passed or the pool was closed before. Raises the
+        error which stopped generation in the background, if any."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed
+                or self._error is not None
+                or not self._refilling,
+                timeout,
+            )
+            if self._error is not None:
+                raise self._error
+            return not self._refilling
+
+    def get(self, N: int) -> RSAKeyPair:
+        """Returns RSA key pair with (2 * N)-bit modulus.
+
+        The key pair is taken from the pool, or generated in the calling
+        thread if there is none ready. Raises the error which stopped
+        generation in the background, if any.
+        """
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            queue = self._queues.get(N)
+            key_pair = queue.popleft() if queue else None
+            if (
+                queue is not None
+                and len(queue) < self.low_water
+                and N not in self._refilling
+            ):
+                self._refilling.append(N)
+                self._condition.notify_all()
+        if key_pair is None:
+            key_pair = rsa_key_gen(N, self.workers)
+        return key_pair
+
+    def _refill(self) -> None:
+        """Generate key pairs for queues which need refilling, until the pool
+        is closed. Run in the background thread."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or bool(self._refilling)
+                )
+                if self._closed:
+                    return
+                N = self._refilling[0]
+            # generate without the lock, so that `get` doesn't wait for it
+            try:
+                key_pair = rsa_key_gen(N, self.workers)
+            except Exception as error:
+                with self._condition:
+                    self._error = error
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                queue = self._queues[N]
+                if len(queue) < self.capacity:
+                    queue.append(key_pair)
+                self._refilling.remove(N)
+                if len(queue) < self.capacity:
+                    # take turns, so that other sizes aren't starved
+                    self._refilling.append(N)
+                self._condition.notify_all()
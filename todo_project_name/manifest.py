@@ -0,0 +1,134 @@
+"""Checksum manifests of directory trees, compatible with `md5sum -c`."""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type, Union
+from .checksum import FileResult, hash_files
+from .md4 import MD4
+from .md5 import MD5
+
+# relative path -> (size in bytes, modification time in ns, hex digest)
+_State = Dict[str, Tuple[int, int, str]]
+
+
+def _state_path(manifest: Path) -> Path:
+    """Returns path of the file storing metadata of hashed files, kept next
+    to the manifest."""
+    return manifest.with_name(manifest.name + ".state")
+
+
+def _read_state(manifest: Path, algorithm: Type[Union[MD4, MD5]]) -> _State:
+    """Read metadata saved by previous run. Returns empty state if there is
+    none, or it was computed with different algorithm."""
+    try:
+        contents = json.loads(_state_path(manifest).read_text("utf8"))
+    except (OSError, ValueError):
+        return {}
+    if contents.get("algorithm") != algorithm.name:
+        return {}
+    return {
+        name: (size, mtime, digest)
+        for name, (size, mtime, digest) in contents["files"].items()
+    }
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    """Write `text` to file, so that it is never left half-written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf8", newline="\n")
+    os.replace(tmp_path, path)
+
+
+def _manifest_line(name: str, digest: str) -> str:
+    """Format single line of the manifest the way `md5sum` does.
+
+    File names containing backslash or new line are escaped, and the line is
+    prefixed with backslash.
+    """
+    if "\\" in name or "\n" in name:
+        name = name.replace("\\", "\\\\").replace("\n", "\\n")
+        return f"\\{digest}  {name}\n"
+    return f"{digest}  {name}\n"
+
+
+def write_manifest(
+    root: Path,
+    manifest: Path,
+    algorithm: Type[Union[MD4, MD5]] = MD5,
+    workers: Optional[int] = None,
+) -> List[FileResult[bytes]]:
+    """Write checksums of all the files in directory tree to the manifest.
+
+    The manifest has the same format as output of `md5sum`, with paths
+    relative to `root`, so it can be checked with `md5sum -c` run in `root`.
+    Sizes and modification times of the files are saved next to the manifest
+    (with ".state" suffix). On later runs, only files which are new or whose
+    size or modification time changed are hashed again.
+
+    Returns list of files which couldn't be hashed. They are omitted from the
+    manifest.
+
+    Parameters
+    ==========
+    root
+    : directory whose files are to be hashed.
+
+    manifest
+    : path of the manifest file. If it is inside `root`, it isn't hashed.
+
+    algorithm
+    : hash algorithm. Default: MD5.
+    Available algorithms: MD4, MD5.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    previous = _read_state(manifest, algorithm)
+    skipped = {manifest.resolve(), _state_path(manifest).resolve()}
+
+    state: _State = {}
+    # absolute path -> relative path, size, modification time
+    to_hash: Dict[str, Tuple[str, int, int]] = {}
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for file in sorted(files):
+            path = Path(directory) / file
+            if path.resolve() in skipped:
+                continue
+            name = path.relative_to(root).as_posix()
+            try:
+                stat = path.stat()
+            except OSError:
+                # e.g. broken symbolic link; reported by `hash_files`
+                to_hash[str(path)] = (name, -1, -1)
+                continue
+            old = previous.get(name)
+            if old is not None and old[:2] == (stat.st_size, stat.st_mtime_ns):
+                state[name] = old
+            else:
+                to_hash[str(path)] = (name, stat.st_size, stat.st_mtime_ns)
+
+    failures = []
+    for result in hash_files(to_hash, algorithm, workers):
+        name, size, mtime = to_hash[result.path]
+        if result.value is None:
+            failures.append(result)
+        else:
+            state[name] = (size, mtime, result.value.hex())
+
+    names = sorted(state)
+    _write_atomically(
+        manifest,
+        "".join(_manifest_line(name, state[name][2]) for name in names),
+    )
+    _write_atomically(
+        _state_path(manifest),
+        json.dumps(
+            {
+                "algorithm": algorithm.name,
+                "files": {name: state[name] for name in names},
+            }
+        ),
+    )
+    return failures
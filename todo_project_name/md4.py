@@ -1,4 +1,4 @@
-from typing import Iterator, List
+from typing import Iterable, List, Optional, Sequence
 from .mdn import MDN
 
 # some variable names may seem obscure; they were taken directly from
@@ -11,24 +11,29 @@ class MD4(MDN):
     It is recommended to use methods `MD4.from_bytes` or `MD4.from_file`
     to create new objects.
 
+    Data can also be fed incrementally, similarly to `hashlib` objects:
+    create empty object with `MD4()` and call `update` method with
+    consecutive parts of the message. Use `copy` to fork the computation.
+
     To get message digest as `str` use `string_digest` method.
     To get message digest as `bytes` read `digest` property.
     """
 
+    name = "md4"
+
     # magic constants (high-order digits given first == big endian)
     ROUND_2 = 0x5A827999
     ROUND_3 = 0x6ED9EBA1
 
-    def __init__(self, message_bytes: Iterator[bytes]):
+    def __init__(self, message_bytes: Optional[Iterable[bytes]] = None):
         """It is recommended to use methods `MD4.from_bytes` or `MD4.from_file`
         to create new objects.
 
         Parameters
         ==========
         message_bytes
-        : Iterator yielding `bytes` of length exactly 64. Last yielded
-        byte string must have length strictly less than 64 (empty byte string
-        may be sometimes necessary).
+        : Iterable of bytes-like objects of any length. If omitted, data can be
+        fed with `update`.
         """
         super().__init__(message_bytes)
 
@@ -69,10 +74,14 @@ class MD4(MDN):
             (A + MD4._h(B, C, D) + X + MD4.ROUND_3) & MD4.last32, s
         )
 
-    def _update(self, X: List[int]) -> None:
+    def _update_reference(self, X: List[int]) -> None:
         """Update internal registers according to MD4 specification:
         do all of the "processing of single 16-word block" from the paper.
 
+        This is straightforward, readable version of `_update`, kept as a
+        reference. It is much slower, as it makes several function calls per
+        step.
+
         Parameters
         ==========
         X: list of 16 32-bit unsigned integers (4-byte words) to be processed.
@@ -107,3 +116,128 @@ class MD4(MDN):
         self._B = (B + self._B) & MD4.last32
         self._C = (C + self._C) & MD4.last32
         self._D = (D + self._D) & MD4.last32
+
+    def _update(self, X: Sequence[int]) -> None:
+        """Update internal registers according to MD4 specification:
+        do all of the "processing of single 16-word block" from the paper.
+
+        Equivalent to `_update_reference`, but with all 48 steps unrolled and
+        functions `_f`, `_g`, `_h` and `MDN.l_roll` inlined. Message indices,
+        shifts and round constants are given as literals, so the computation
+        uses only local variables. Majority function of round 2 is computed as
+        `(X & Y) | ((X | Y) & Z)`, which saves one operation.
+
+        Parameters
+        ==========
+        X: sequence of 16 32-bit unsigned integers (4-byte words) to be
+        processed.
+        """
+        a = self._A  # self._A is `AA` from the paper
+        b = self._B  # the rest accordingly.
+        c = self._C
+        d = self._D
+
+        # round 1
+        a = (a + ((b & c) | (~b & d)) + X[0]) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[1]) & 0xFFFFFFFF
+        d = (d << 7 | d >> 25) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[2]) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[3]) & 0xFFFFFFFF
+        b = (b << 19 | b >> 13) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[4]) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[5]) & 0xFFFFFFFF
+        d = (d << 7 | d >> 25) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[6]) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[7]) & 0xFFFFFFFF
+        b = (b << 19 | b >> 13) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[8]) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[9]) & 0xFFFFFFFF
+        d = (d << 7 | d >> 25) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[10]) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[11]) & 0xFFFFFFFF
+        b = (b << 19 | b >> 13) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[12]) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[13]) & 0xFFFFFFFF
+        d = (d << 7 | d >> 25) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[14]) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[15]) & 0xFFFFFFFF
+        b = (b << 19 | b >> 13) & 0xFFFFFFFF
+        # round 2
+        a = (a + ((b & c) | ((b | c) & d)) + X[0] + 0x5A827999) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | ((a | b) & c)) + X[4] + 0x5A827999) & 0xFFFFFFFF
+        d = (d << 5 | d >> 27) & 0xFFFFFFFF
+        c = (c + ((d & a) | ((d | a) & b)) + X[8] + 0x5A827999) & 0xFFFFFFFF
+        c = (c << 9 | c >> 23) & 0xFFFFFFFF
+        b = (b + ((c & d) | ((c | d) & a)) + X[12] + 0x5A827999) & 0xFFFFFFFF
+        b = (b << 13 | b >> 19) & 0xFFFFFFFF
+        a = (a + ((b & c) | ((b | c) & d)) + X[1] + 0x5A827999) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | ((a | b) & c)) + X[5] + 0x5A827999) & 0xFFFFFFFF
+        d = (d << 5 | d >> 27) & 0xFFFFFFFF
+        c = (c + ((d & a) | ((d | a) & b)) + X[9] + 0x5A827999) & 0xFFFFFFFF
+        c = (c << 9 | c >> 23) & 0xFFFFFFFF
+        b = (b + ((c & d) | ((c | d) & a)) + X[13] + 0x5A827999) & 0xFFFFFFFF
+        b = (b << 13 | b >> 19) & 0xFFFFFFFF
+        a = (a + ((b & c) | ((b | c) & d)) + X[2] + 0x5A827999) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | ((a | b) & c)) + X[6] + 0x5A827999) & 0xFFFFFFFF
+        d = (d << 5 | d >> 27) & 0xFFFFFFFF
+        c = (c + ((d & a) | ((d | a) & b)) + X[10] + 0x5A827999) & 0xFFFFFFFF
+        c = (c << 9 | c >> 23) & 0xFFFFFFFF
+        b = (b + ((c & d) | ((c | d) & a)) + X[14] + 0x5A827999) & 0xFFFFFFFF
+        b = (b << 13 | b >> 19) & 0xFFFFFFFF
+        a = (a + ((b & c) | ((b | c) & d)) + X[3] + 0x5A827999) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + ((a & b) | ((a | b) & c)) + X[7] + 0x5A827999) & 0xFFFFFFFF
+        d = (d << 5 | d >> 27) & 0xFFFFFFFF
+        c = (c + ((d & a) | ((d | a) & b)) + X[11] + 0x5A827999) & 0xFFFFFFFF
+        c = (c << 9 | c >> 23) & 0xFFFFFFFF
+        b = (b + ((c & d) | ((c | d) & a)) + X[15] + 0x5A827999) & 0xFFFFFFFF
+        b = (b << 13 | b >> 19) & 0xFFFFFFFF
+        # round 3
+        a = (a + (b ^ c ^ d) + X[0] + 0x6ED9EBA1) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[8] + 0x6ED9EBA1) & 0xFFFFFFFF
+        d = (d << 9 | d >> 23) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[4] + 0x6ED9EBA1) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[12] + 0x6ED9EBA1) & 0xFFFFFFFF
+        b = (b << 15 | b >> 17) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[2] + 0x6ED9EBA1) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[10] + 0x6ED9EBA1) & 0xFFFFFFFF
+        d = (d << 9 | d >> 23) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[6] + 0x6ED9EBA1) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[14] + 0x6ED9EBA1) & 0xFFFFFFFF
+        b = (b << 15 | b >> 17) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[1] + 0x6ED9EBA1) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[9] + 0x6ED9EBA1) & 0xFFFFFFFF
+        d = (d << 9 | d >> 23) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[5] + 0x6ED9EBA1) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[13] + 0x6ED9EBA1) & 0xFFFFFFFF
+        b = (b << 15 | b >> 17) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[3] + 0x6ED9EBA1) & 0xFFFFFFFF
+        a = (a << 3 | a >> 29) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[11] + 0x6ED9EBA1) & 0xFFFFFFFF
+        d = (d << 9 | d >> 23) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[7] + 0x6ED9EBA1) & 0xFFFFFFFF
+        c = (c << 11 | c >> 21) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[15] + 0x6ED9EBA1) & 0xFFFFFFFF
+        b = (b << 15 | b >> 17) & 0xFFFFFFFF
+
+        self._A = (a + self._A) & 0xFFFFFFFF
+        self._B = (b + self._B) & 0xFFFFFFFF
+        self._C = (c + self._C) & 0xFFFFFFFF
+        self._D = (d + self._D) & 0xFFFFFFFF
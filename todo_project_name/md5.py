@@ -1,5 +1,5 @@
 from math import sin, floor
-from typing import Iterator, List
+from typing import Iterable, List, Optional, Sequence
 from .mdn import MDN
 
 # some variable names may seem obscure; they were taken directly from
@@ -13,23 +13,28 @@ class MD5(MDN):
     It is recommended to use methods `MD5.from_bytes` or `MD5.from_file`
     to create new objects.
 
+    Data can also be fed incrementally, similarly to `hashlib` objects:
+    create empty object with `MD5()` and call `update` method with
+    consecutive parts of the message. Use `copy` to fork the computation.
+
     To get message digest as `str` use `string_digest` method.
     To get message digest as `bytes` read `digest` property.
     """
 
+    name = "md5"
+
     # magic constants
     T = list(floor(4294967296 * abs(sin(i + 1))) for i in range(64))
 
-    def __init__(self, message_bytes: Iterator[bytes]):
+    def __init__(self, message_bytes: Optional[Iterable[bytes]] = None):
         """It is recommended to use methods `MD5.from_bytes` or `MD5.from_file`
         to create new objects.
 
         Parameters
         ==========
         message_bytes
-        : Iterator yielding `bytes` of length exactly 64. Last yielded
-        byte string must have length strictly less than 64 (empty byte string
-        may be sometimes necessary).
+        : Iterable of bytes-like objects of any length. If omitted, data can be
+        fed with `update`.
         """
         super().__init__(message_bytes)
 
@@ -88,10 +93,14 @@ class MD5(MDN):
             + MDN.l_roll((A + MD5._i(B, C, D) + X + MD5.T[i]) & MDN.last32, s)
         ) & MDN.last32
 
-    def _update(self, X: List[int]) -> None:
+    def _update_reference(self, X: List[int]) -> None:
         """Update internal registers according to MD5 specification:
         do all of the "processing of single 16-word block" from the paper.
 
+        This is straightforward, readable version of `_update`, kept as a
+        reference. It is much slower, as it makes several function calls per
+        step.
+
         Parameters
         ==========
         X: list of 16 32-bit unsigned integers (4-byte words) to be processed.
@@ -149,3 +158,165 @@ class MD5(MDN):
         self._B = (B + self._B) & MDN.last32
         self._C = (C + self._C) & MDN.last32
         self._D = (D + self._D) & MDN.last32
+
+    def _update(self, X: Sequence[int]) -> None:
+        """Update internal registers according to MD5 specification:
+        do all of the "processing of single 16-word block" from the paper.
+
+        Equivalent to `_update_reference`, but with all 64 steps unrolled and
+        functions `_f`, `_g`, `_h`, `_i` and `MDN.l_roll` inlined. Message
+        indices, shifts and elements of `MD5.T` are given as literals, so the
+        computation uses only local variables. It avoids hundreds of function
+        calls per block.
+
+        Rolled value is not masked before adding it to the next register: bits
+        above 32nd don't affect lower ones in addition, so single mask of the
+        sum suffices.
+
+        Parameters
+        ==========
+        X: sequence of 16 32-bit unsigned integers (4-byte words) to be
+        processed.
+        """
+        a = self._A  # self._A is `AA` from the paper
+        b = self._B  # the rest accordingly.
+        c = self._C
+        d = self._D
+
+        # round 1
+        a = (a + ((b & c) | (~b & d)) + X[0] + 0xD76AA478) & 0xFFFFFFFF
+        a = (b + (a << 7 | a >> 25)) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[1] + 0xE8C7B756) & 0xFFFFFFFF
+        d = (a + (d << 12 | d >> 20)) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[2] + 0x242070DB) & 0xFFFFFFFF
+        c = (d + (c << 17 | c >> 15)) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[3] + 0xC1BDCEEE) & 0xFFFFFFFF
+        b = (c + (b << 22 | b >> 10)) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[4] + 0xF57C0FAF) & 0xFFFFFFFF
+        a = (b + (a << 7 | a >> 25)) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[5] + 0x4787C62A) & 0xFFFFFFFF
+        d = (a + (d << 12 | d >> 20)) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[6] + 0xA8304613) & 0xFFFFFFFF
+        c = (d + (c << 17 | c >> 15)) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[7] + 0xFD469501) & 0xFFFFFFFF
+        b = (c + (b << 22 | b >> 10)) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[8] + 0x698098D8) & 0xFFFFFFFF
+        a = (b + (a << 7 | a >> 25)) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[9] + 0x8B44F7AF) & 0xFFFFFFFF
+        d = (a + (d << 12 | d >> 20)) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[10] + 0xFFFF5BB1) & 0xFFFFFFFF
+        c = (d + (c << 17 | c >> 15)) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[11] + 0x895CD7BE) & 0xFFFFFFFF
+        b = (c + (b << 22 | b >> 10)) & 0xFFFFFFFF
+        a = (a + ((b & c) | (~b & d)) + X[12] + 0x6B901122) & 0xFFFFFFFF
+        a = (b + (a << 7 | a >> 25)) & 0xFFFFFFFF
+        d = (d + ((a & b) | (~a & c)) + X[13] + 0xFD987193) & 0xFFFFFFFF
+        d = (a + (d << 12 | d >> 20)) & 0xFFFFFFFF
+        c = (c + ((d & a) | (~d & b)) + X[14] + 0xA679438E) & 0xFFFFFFFF
+        c = (d + (c << 17 | c >> 15)) & 0xFFFFFFFF
+        b = (b + ((c & d) | (~c & a)) + X[15] + 0x49B40821) & 0xFFFFFFFF
+        b = (c + (b << 22 | b >> 10)) & 0xFFFFFFFF
+        # round 2
+        a = (a + ((b & d) | (c & ~d)) + X[1] + 0xF61E2562) & 0xFFFFFFFF
+        a = (b + (a << 5 | a >> 27)) & 0xFFFFFFFF
+        d = (d + ((a & c) | (b & ~c)) + X[6] + 0xC040B340) & 0xFFFFFFFF
+        d = (a + (d << 9 | d >> 23)) & 0xFFFFFFFF
+        c = (c + ((d & b) | (a & ~b)) + X[11] + 0x265E5A51) & 0xFFFFFFFF
+        c = (d + (c << 14 | c >> 18)) & 0xFFFFFFFF
+        b = (b + ((c & a) | (d & ~a)) + X[0] + 0xE9B6C7AA) & 0xFFFFFFFF
+        b = (c + (b << 20 | b >> 12)) & 0xFFFFFFFF
+        a = (a + ((b & d) | (c & ~d)) + X[5] + 0xD62F105D) & 0xFFFFFFFF
+        a = (b + (a << 5 | a >> 27)) & 0xFFFFFFFF
+        d = (d + ((a & c) | (b & ~c)) + X[10] + 0x02441453) & 0xFFFFFFFF
+        d = (a + (d << 9 | d >> 23)) & 0xFFFFFFFF
+        c = (c + ((d & b) | (a & ~b)) + X[15] + 0xD8A1E681) & 0xFFFFFFFF
+        c = (d + (c << 14 | c >> 18)) & 0xFFFFFFFF
+        b = (b + ((c & a) | (d & ~a)) + X[4] + 0xE7D3FBC8) & 0xFFFFFFFF
+        b = (c + (b << 20 | b >> 12)) & 0xFFFFFFFF
+        a = (a + ((b & d) | (c & ~d)) + X[9] + 0x21E1CDE6) & 0xFFFFFFFF
+        a = (b + (a << 5 | a >> 27)) & 0xFFFFFFFF
+        d = (d + ((a & c) | (b & ~c)) + X[14] + 0xC33707D6) & 0xFFFFFFFF
+        d = (a + (d << 9 | d >> 23)) & 0xFFFFFFFF
+        c = (c + ((d & b) | (a & ~b)) + X[3] + 0xF4D50D87) & 0xFFFFFFFF
+        c = (d + (c << 14 | c >> 18)) & 0xFFFFFFFF
+        b = (b + ((c & a) | (d & ~a)) + X[8] + 0x455A14ED) & 0xFFFFFFFF
+        b = (c + (b << 20 | b >> 12)) & 0xFFFFFFFF
+        a = (a + ((b & d) | (c & ~d)) + X[13] + 0xA9E3E905) & 0xFFFFFFFF
+        a = (b + (a << 5 | a >> 27)) & 0xFFFFFFFF
+        d = (d + ((a & c) | (b & ~c)) + X[2] + 0xFCEFA3F8) & 0xFFFFFFFF
+        d = (a + (d << 9 | d >> 23)) & 0xFFFFFFFF
+        c = (c + ((d & b) | (a & ~b)) + X[7] + 0x676F02D9) & 0xFFFFFFFF
+        c = (d + (c << 14 | c >> 18)) & 0xFFFFFFFF
+        b = (b + ((c & a) | (d & ~a)) + X[12] + 0x8D2A4C8A) & 0xFFFFFFFF
+        b = (c + (b << 20 | b >> 12)) & 0xFFFFFFFF
+        # round 3
+        a = (a + (b ^ c ^ d) + X[5] + 0xFFFA3942) & 0xFFFFFFFF
+        a = (b + (a << 4 | a >> 28)) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[8] + 0x8771F681) & 0xFFFFFFFF
+        d = (a + (d << 11 | d >> 21)) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[11] + 0x6D9D6122) & 0xFFFFFFFF
+        c = (d + (c << 16 | c >> 16)) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[14] + 0xFDE5380C) & 0xFFFFFFFF
+        b = (c + (b << 23 | b >> 9)) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[1] + 0xA4BEEA44) & 0xFFFFFFFF
+        a = (b + (a << 4 | a >> 28)) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[4] + 0x4BDECFA9) & 0xFFFFFFFF
+        d = (a + (d << 11 | d >> 21)) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[7] + 0xF6BB4B60) & 0xFFFFFFFF
+        c = (d + (c << 16 | c >> 16)) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[10] + 0xBEBFBC70) & 0xFFFFFFFF
+        b = (c + (b << 23 | b >> 9)) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[13] + 0x289B7EC6) & 0xFFFFFFFF
+        a = (b + (a << 4 | a >> 28)) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[0] + 0xEAA127FA) & 0xFFFFFFFF
+        d = (a + (d << 11 | d >> 21)) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[3] + 0xD4EF3085) & 0xFFFFFFFF
+        c = (d + (c << 16 | c >> 16)) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[6] + 0x04881D05) & 0xFFFFFFFF
+        b = (c + (b << 23 | b >> 9)) & 0xFFFFFFFF
+        a = (a + (b ^ c ^ d) + X[9] + 0xD9D4D039) & 0xFFFFFFFF
+        a = (b + (a << 4 | a >> 28)) & 0xFFFFFFFF
+        d = (d + (a ^ b ^ c) + X[12] + 0xE6DB99E5) & 0xFFFFFFFF
+        d = (a + (d << 11 | d >> 21)) & 0xFFFFFFFF
+        c = (c + (d ^ a ^ b) + X[15] + 0x1FA27CF8) & 0xFFFFFFFF
+        c = (d + (c << 16 | c >> 16)) & 0xFFFFFFFF
+        b = (b + (c ^ d ^ a) + X[2] + 0xC4AC5665) & 0xFFFFFFFF
+        b = (c + (b << 23 | b >> 9)) & 0xFFFFFFFF
+        # round 4
+        a = (a + (c ^ (b | ~d)) + X[0] + 0xF4292244) & 0xFFFFFFFF
+        a = (b + (a << 6 | a >> 26)) & 0xFFFFFFFF
+        d = (d + (b ^ (a | ~c)) + X[7] + 0x432AFF97) & 0xFFFFFFFF
+        d = (a + (d << 10 | d >> 22)) & 0xFFFFFFFF
+        c = (c + (a ^ (d | ~b)) + X[14] + 0xAB9423A7) & 0xFFFFFFFF
+        c = (d + (c << 15 | c >> 17)) & 0xFFFFFFFF
+        b = (b + (d ^ (c | ~a)) + X[5] + 0xFC93A039) & 0xFFFFFFFF
+        b = (c + (b << 21 | b >> 11)) & 0xFFFFFFFF
+        a = (a + (c ^ (b | ~d)) + X[12] + 0x655B59C3) & 0xFFFFFFFF
+        a = (b + (a << 6 | a >> 26)) & 0xFFFFFFFF
+        d = (d + (b ^ (a | ~c)) + X[3] + 0x8F0CCC92) & 0xFFFFFFFF
+        d = (a + (d << 10 | d >> 22)) & 0xFFFFFFFF
+        c = (c + (a ^ (d | ~b)) + X[10] + 0xFFEFF47D) & 0xFFFFFFFF
+        c = (d + (c << 15 | c >> 17)) & 0xFFFFFFFF
+        b = (b + (d ^ (c | ~a)) + X[1] + 0x85845DD1) & 0xFFFFFFFF
+        b = (c + (b << 21 | b >> 11)) & 0xFFFFFFFF
+        a = (a + (c ^ (b | ~d)) + X[8] + 0x6FA87E4F) & 0xFFFFFFFF
+        a = (b + (a << 6 | a >> 26)) & 0xFFFFFFFF
+        d = (d + (b ^ (a | ~c)) + X[15] + 0xFE2CE6E0) & 0xFFFFFFFF
+        d = (a + (d << 10 | d >> 22)) & 0xFFFFFFFF
+        c = (c + (a ^ (d | ~b)) + X[6] + 0xA3014314) & 0xFFFFFFFF
+        c = (d + (c << 15 | c >> 17)) & 0xFFFFFFFF
+        b = (b + (d ^ (c | ~a)) + X[13] + 0x4E0811A1) & 0xFFFFFFFF
+        b = (c + (b << 21 | b >> 11)) & 0xFFFFFFFF
+        a = (a + (c ^ (b | ~d)) + X[4] + 0xF7537E82) & 0xFFFFFFFF
+        a = (b + (a << 6 | a >> 26)) & 0xFFFFFFFF
+        d = (d + (b ^ (a | ~c)) + X[11] + 0xBD3AF235) & 0xFFFFFFFF
+        d = (a + (d << 10 | d >> 22)) & 0xFFFFFFFF
+        c = (c + (a ^ (d | ~b)) + X[2] + 0x2AD7D2BB) & 0xFFFFFFFF
+        c = (d + (c << 15 | c >> 17)) & 0xFFFFFFFF
+        b = (b + (d ^ (c | ~a)) + X[9] + 0xEB86D391) & 0xFFFFFFFF
+        b = (c + (b << 21 | b >> 11)) & 0xFFFFFFFF
+
+        self._A = (a + self._A) & 0xFFFFFFFF
+        self._B = (b + self._B) & 0xFFFFFFFF
+        self._C = (c + self._C) & 0xFFFFFFFF
+        self._D = (d + self._D) & 0xFFFFFFFF
@@ -1,67 +1,215 @@
 from __future__ import annotations
+import mmap
+from io import BufferedIOBase
+import os
+import stat
 import struct
 from abc import ABC, abstractmethod
-from typing import Iterator, List
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from .digest_cache import DigestCache
 
 # some variable names may seem obscure; they were taken directly from
 # the article "The MD4 Message Digest Algorithm" by Ronald L. Rivest
 
+# objects supporting buffer protocol, which can be hashed without copying
+ReadableBuffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+MDNVar = TypeVar("MDNVar", bound="MDN")
+
+# Layout of exported state: algorithm name, registers A, B, C, D and number
+# of bytes fed so far. Unprocessed bytes (less than 64) follow.
+STATE_FORMAT = "<4s4IQ"
+
+# Number of bytes read from file at once. Small reads make system calls
+# overhead dominant, especially on network file systems.
+DEFAULT_BUFFER_SIZE = 1 << 20  # 1 MiB
+
 
 class MDN(ABC):
     """Superclass of MD4 and MD5. Works for little-endian architecture."""
 
+    name: str  # name of the algorithm, set by derived classes
     padding = 0x80.to_bytes(64, "little")  # 10000...000 -- 512 bits in total
+    block_size = 64  # in bytes
+    digest_size = 16  # in bytes
     last32 = 0xFFFFFFFF
     last64 = 0xFFFFFFFFFFFFFFFF
 
-    def __init__(self, message_bytes: Iterator[bytes]):
+    def __init__(self, message_bytes: Optional[Iterable[bytes]] = None):
         """All derived classes should have constructor with this signature.
 
         Parameters
         ==========
         message_bytes
-        : Iterator yielding `bytes` of length exactly 64. Last yielded
-        byte string must have length strictly less than 64 (empty byte string
-        may be sometimes necessary). Class computes message digest of these bytes
-        as if they were just single byte string.
+        : Iterable of bytes-like objects of any length. Class computes message
+        digest of these bytes as if they were just single byte string. If
+        omitted, object represents digest of empty message, and more data can
+        be fed with `update`.
         """
-        self._A = self._B = self._C = self._D = 0
-        self.__digest = b""
-        self._run_algoritm(message_bytes)
+        self._A = 0x67452301
+        self._B = 0xEFCDAB89
+        self._C = 0x98BADCFE
+        self._D = 0x10325476
+        self._buffer = b""  # unprocessed bytes, always shorter than 64
+        self._bytes_no = 0  # number of bytes fed so far
+        self.__digest: Optional[bytes] = None  # cached result of finalization
+        if message_bytes is not None:
+            self._run_algoritm(message_bytes)
 
-    def _run_algoritm(self, message_bytes: Iterator[bytes]) -> None:
-        """Common structure of md4 and md5 algorithms.
+    def _run_algoritm(self, message_bytes: Iterable[bytes]) -> None:
+        """Feed all the chunks yielded by `message_bytes` to the algorithm.
 
         Parameters
         ==========
         message_bytes
-        : Iterator yielding `bytes` of length exactly 64. Last yielded
-        byte string must have length strictly less than 64 (empty byte string
-        may be sometimes necessary).
+        : Iterable of bytes-like objects of any length.
+        """
+        for chunk in message_bytes:
+            self.update(chunk)
+
+    def update(self, data: ReadableBuffer) -> None:
+        """Feed more bytes to the algorithm. Repeated calls are equivalent to
+        a single call with concatenation of all the arguments.
+
+        Parameters
+        ==========
+        data
+        : next part of the message. May have any length. Any object supporting
+        buffer protocol (`bytes`, `bytearray`, `memoryview`, `mmap.mmap`...)
+        is accepted, and it is not copied, apart from the last incomplete
+        block. Therefore, `data` can be safely modified after this method
+        returns.
+        """
+        self.__digest = None
+        with memoryview(data).cast("B") as view:
+            data_len = len(view)
+            self._bytes_no += data_len
+
+            # complete the block left by previous call
+            idx = 0
+            if self._buffer:
+                idx = min(64 - len(self._buffer), data_len)
+                self._buffer += view[:idx]
+                if len(self._buffer) < 64:
+                    return
+                self._update(struct.unpack("<16I", self._buffer))
+
+            # decode all the full blocks at once, without slicing them
+            end = idx + (data_len - idx) // 64 * 64
+            if idx < end:
+                update = self._update
+                # 16 unsigned integers at once
+                for X in struct.iter_unpack("<16I", view[idx:end]):
+                    update(X)
+            self._buffer = bytes(view[end:])
+
+    def copy(self) -> MDN:
+        """Return independent copy of the object, i.e. one that can be
+        updated without affecting the original."""
+        other = self._from_state(self._state())
+        other.__digest = self.__digest
+        return other
+
+    @property
+    def bytes_processed(self) -> int:
+        """Number of bytes fed to the algorithm so far."""
+        return self._bytes_no
+
+    def export_state(self) -> bytes:
+        """Returns intermediate state of the computation as `bytes`, which
+        can be saved and later passed to `import_state` to continue the
+        computation, e.g. in another process.
+
+        The state consists of registers, number of bytes processed and
+        unprocessed bytes of the last incomplete block, so it is shortest when
+        the number of bytes fed so far is multiple of 64.
+        """
+        return (
+            struct.pack(
+                STATE_FORMAT,
+                self.name.encode("ascii"),
+                self._A,
+                self._B,
+                self._C,
+                self._D,
+                self._bytes_no,
+            )
+            + self._buffer
+        )
+
+    @classmethod
+    def import_state(cls: Type[MDNVar], state: bytes) -> MDNVar:
+        """Create object continuing the computation from `state` returned by
+        `export_state` method.
+
+        Parameters
+        ==========
+        state
+        : state exported by object of the same class.
+        """
+        header_size = struct.calcsize(STATE_FORMAT)
+        if len(state) < header_size:
+            raise ValueError("The state is too short.")
+        name, A, B, C, D, bytes_no = struct.unpack_from(STATE_FORMAT, state)
+        if name.rstrip(b"\0") != cls.name.encode("ascii"):
+            raise ValueError(
+                f"The state was exported by {name!r}, not {cls.name!r}."
+            )
+        buffer = state[header_size:]
+        if len(buffer) != bytes_no % 64:
+            raise ValueError("The state is corrupted.")
+        return cls._from_state((A, B, C, D, bytes_no, buffer))
+
+    def _state(self) -> Tuple[int, int, int, int, int, bytes]:
+        """Returns everything needed to continue the computation: registers
+        A, B, C, D, number of bytes fed so far and unprocessed bytes."""
+        return (
+            self._A,
+            self._B,
+            self._C,
+            self._D,
+            self._bytes_no,
+            self._buffer,
+        )
+
+    @classmethod
+    def _from_state(
+        cls: Type[MDNVar], state: Tuple[int, int, int, int, int, bytes]
+    ) -> MDNVar:
+        """Create object continuing computation from `state`, as returned by
+        `_state` method of an object of the same class."""
+        md = cls()
+        md._A, md._B, md._C, md._D, md._bytes_no, md._buffer = state
+        return md
+
+    def _finalize(self) -> bytes:
+        """Compute message digest of the data fed so far. Object's state is
+        not modified.
 
         Notes
         =====
         This function uses `_update` method, which should be implemented by
         derived classes.
         """
-        # preparing for the algorithm
-        self._A = 0x67452301
-        self._B = 0xEFCDAB89
-        self._C = 0x98BADCFE
-        self._D = 0x10325476
-
-        # running the algorithm
-        bits_no = 0
-
-        while len(chunk := next(message_bytes)) == 64:
-            X = list(struct.unpack("<16I", chunk))  # 16 unsigned integers
-            self._update(X)
-            bits_no += 512
+        # registers are modified by `_update`, so work on a copy
+        final = self.copy()
 
         # padding and running last iteration (or 2 in the case of empty padding or
         # over 56 bytes left)
-        message = chunk  # remaining bytes
-        left = len(chunk)
+        message = final._buffer  # remaining bytes
+        left = len(message)
         # b == 8 * left
         # bits to append: 448 - b (mod 512)
         # bytes to append: 56 - left (mod 64)
@@ -69,88 +217,137 @@ class MDN(ABC):
         if add == 0:
             add = 64
         message += MDN.padding[:add]
-        bits_no += left * 8
 
         if left + add > 64:  # can be only 56 or 120
-            X = list(struct.unpack("<16I", message[:64]))
-            self._update(X)
+            final._update(struct.unpack("<16I", message[:64]))
             message = message[64:]  # only 1 unprocessed pack of 16 words
 
         # appending number of bits
         message += struct.pack(
-            "<Q", bits_no & MDN.last64
+            "<Q", (final._bytes_no * 8) & MDN.last64
         )  # Q: unsigned long long (8 bytes)
-        X = list(struct.unpack("<16I", message))
-        self._update(X)
+        final._update(struct.unpack("<16I", message))
 
         # getting the result
-        self.__digest = struct.pack("<4I", self._A, self._B, self._C, self._D)
-        # done
+        return struct.pack("<4I", final._A, final._B, final._C, final._D)
 
     def string_digest(self) -> str:
         """Returns string representation of message digest."""
-        return "".join(f"{byte:02x}" for byte in self.__digest)
+        return "".join(f"{byte:02x}" for byte in self.digest)
+
+    def hexdigest(self) -> str:
+        """Returns string representation of message digest. Alias of
+        `string_digest`, for compatibility with `hashlib`."""
+        return self.string_digest()
 
     @property
-    def digest(self):
-        """The message digest as bytes."""
+    def digest(self) -> bytes:
+        """The message digest as bytes, of all the data fed so far."""
+        if self.__digest is None:
+            self.__digest = self._finalize()
         return self.__digest
 
-    @staticmethod
-    def _bytes_as_generator(byte_string: bytes) -> Iterator[bytes]:
-        """Convert `bytes` to generator yielding `bytes` of length 64.
-        Last byte string has length strictly less than 64 (may be 0).
+    def update_from_file(
+        self,
+        file: BufferedIOBase,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        limit: Optional[int] = None,
+        checkpoint: Optional[Callable[[MDN], None]] = None,
+    ) -> None:
+        """Feed bytes of `file`, from its current position to the end, to the
+        algorithm. Together with `file.seek` and `limit`, it allows to hash
+        any range of the file.
 
         Parameters
         ==========
-        byte_string
-        : sequence of bytes to be converted to iterator.
-        """
-        # Works similarly to itertools.batched, but ensures that last returned
-        # element has length strictly smaller than 64, which serves as break
-        # condition.
-        idx = 0
-        str_len = len(byte_string)
-        while idx + 64 <= str_len:
-            yield byte_string[idx : idx + 64]
-            idx += 64
-
-        # last one might be empty, but still yield it.
-        yield byte_string[idx:]
+        file
+        : binary file opened for reading.
 
-    @staticmethod
-    def _file_bytes_generator(
-        filename: str, *, page_size: int = 4096
-    ) -> Iterator[bytes]:
-        """Create generator yielding pieces of file as `bytes` of length 64.
-        Last byte string has length strictly less than 64 (may be 0).
+        buffer_size
+        : number of bytes read from file at once. Must be positive. This is
+        optimization parameter. Default value is 1 MiB.
 
-        Parameters
-        ==========
-        filename
-        : path to existing file from which bytes will be read.
+        limit
+        : if given, at most this number of bytes is read. Default: None.
 
-        page_size
-        : number of bytes read from file at once. Must be positive. This is
-        optimization parameter - regardless of its value, created generator always
-        yields byte strings of length exactly 64, and last one strictly less than
-        64. Default value is 4096 (4KiB).
+        checkpoint
+        : if given, it is called with this object after each read.
         """
-        # Works similarly to itertools.batched, but ensures that last returned
-        # element has length strictly smaller than 64, which serves as break
-        # condition.
-        with open(filename, "rb") as file:
-            # reading 4KiB at once is much more efficient than 64 bytes.
-            while (buff := file.read(page_size)) != b"":
-                if len(buff) < page_size:  # end of file
-                    yield from MDN._bytes_as_generator(buff)
-                    return
+        if buffer_size <= 0:
+            raise ValueError("`buffer_size` must be positive.")
+        if limit is not None:
+            buffer_size = max(1, min(buffer_size, limit))
+
+        # Single buffer is reused for all the reads, so no new objects are
+        # allocated. Reads may be shorter than the buffer (e.g. for pipes),
+        # and only empty read means end of file.
+        buffer = bytearray(buffer_size)
+        with memoryview(buffer) as view:
+            while limit is None or limit > 0:
+                if limit is None or limit >= buffer_size:
+                    read = file.readinto(view)
+                else:
+                    read = file.readinto(view[:limit])
+                if not read:
+                    break
+                self.update(view[:read])
+                if limit is not None:
+                    limit -= read
+                if checkpoint is not None:
+                    checkpoint(self)
+
+    def _update_from_mapping(
+        self,
+        file: BufferedIOBase,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        checkpoint: Optional[Callable[[MDN], None]] = None,
+    ) -> bool:
+        """Feed the rest of `file` to the algorithm, mapping it into memory.
+
+        Returns False, without reading anything, if the file cannot be mapped,
+        e.g. it is pipe, special file or empty file. Returns True otherwise.
 
-                # Full 4 KiB to divide into chunks
-                for idx in range(0, page_size, 64):
-                    yield buff[idx : idx + 64]
+        Parameters
+        ==========
+        file
+        : binary file opened for reading. Bytes from its current position
+        to the end are fed.
+
+        buffer_size
+        : number of bytes fed between calls to `checkpoint`. Must be
+        positive. Default: 1 MiB.
 
-            yield b""  # in case of file size being divisible by 4 KiB
+        checkpoint
+        : if given, it is called with this object after each `buffer_size`
+        bytes. Otherwise the whole mapping is fed at once.
+        """
+        try:
+            if not stat.S_ISREG(os.fstat(file.fileno()).st_mode):
+                return False
+            # ValueError is raised for empty files
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        with mapping:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):  # not available on Windows
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            start = file.tell()
+            if checkpoint is None and start == 0:
+                self.update(mapping)
+                return True
+            if checkpoint is None:
+                buffer_size = len(mapping)
+            elif buffer_size <= 0:
+                raise ValueError("`buffer_size` must be positive.")
+            with memoryview(mapping) as view:
+                for idx in range(start, len(view), buffer_size):
+                    self.update(view[idx : idx + buffer_size])
+                    if checkpoint is not None:
+                        checkpoint(self)
+        return True
 
     @classmethod
     def from_bytes(cls, byte_string: bytes) -> MDN:
@@ -162,10 +359,21 @@ class MDN(ABC):
         byte_string
         : message whose digest is to be computed.
         """
-        return cls(MDN._bytes_as_generator(byte_string))
+        md = cls()
+        md.update(byte_string)
+        return md
 
     @classmethod
-    def from_file(cls, filename: str) -> MDN:
+    def from_file(
+        cls,
+        filename: str,
+        *,
+        mmap: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        cache: Optional[DigestCache] = None,
+        state: Optional[bytes] = None,
+        checkpoint: Optional[Callable[[MDN], None]] = None,
+    ) -> MDN:
         """This function serves as constructor, which allows to compute hash
         of file under given path.
 
@@ -173,8 +381,58 @@ class MDN(ABC):
         ==========
         filename
         : path to existing file whose digest is to be computed.
+
+        mmap
+        : if True, the file is mapped into memory and hashed directly from
+        page cache, which saves read system calls and copying. Pipes, special
+        files and empty files are read in the usual way. Default: False.
+
+        buffer_size
+        : number of bytes read from file at once, when it isn't mapped. Must
+        be positive. Default: 1 MiB.
+
+        cache
+        : if given, the result is looked up in the cache first, and stored
+        there after computing. Default: None.
+
+        state
+        : state exported from object which was fed with beginning of the
+        file (e.g. by `checkpoint`). The computation is resumed from it, and
+        only the rest of the file is read. Default: None.
+
+        checkpoint
+        : function called with the hash object after every `buffer_size`
+        bytes. It may save `export_state()`, so that computation interrupted
+        by a crash can be resumed. Default: None.
         """
-        return cls(MDN._file_bytes_generator(filename))
+        if cache is not None and (md := cache.get(filename, cls)) is not None:
+            return md
+
+        md = cls() if state is None else cls.import_state(state)
+        with open(filename, "rb") as file:
+            # metadata from before reading, so that modification during
+            # hashing invalidates the cache entry
+            file_stat = os.fstat(file.fileno())
+            if md.bytes_processed:
+                if (
+                    stat.S_ISREG(file_stat.st_mode)
+                    and file_stat.st_size < md.bytes_processed
+                ):
+                    raise ValueError("The file is shorter than the state.")
+                file.seek(md.bytes_processed)
+            if not (
+                mmap
+                and md._update_from_mapping(
+                    file, buffer_size=buffer_size, checkpoint=checkpoint
+                )
+            ):
+                md.update_from_file(
+                    file, buffer_size=buffer_size, checkpoint=checkpoint
+                )
+
+        if cache is not None:
+            cache.put(filename, md, file_stat)
+        return md
 
     @staticmethod
     def l_roll(X: int, s: int) -> int:
@@ -190,14 +448,14 @@ class MDN(ABC):
         return ((X << s) & MDN.last32) | (X >> (32 - s))
 
     @abstractmethod
-    def _update(self, X: List[int]) -> None:
+    def _update(self, X: Sequence[int]) -> None:
         """This method should update internal registers according to MD*
         specification. It should do all of the "processing of single 16-word block"
         from the paper.
 
         Parameters
         ==========
-        X: list of 16 32-bit unsigned integers to be processed.
+        X: sequence of 16 32-bit unsigned integers to be processed.
         """
         raise NotImplementedError(
             "Derived class should implement this method."
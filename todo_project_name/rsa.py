@@ -1,11 +1,36 @@
+import os
 import secrets
-from typing import Any, TypeVar, Union, Type, Optional
-from .find_prime import find_prime
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import islice
+from typing import (
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+    Type,
+    Optional,
+    Set,
+)
+from .find_prime import find_prime, find_primes
 from pathlib import Path
 import math
 from dataclasses import dataclass
 from .md4 import MD4
 from .md5 import MD5
+from .checksum import FileResult
+from .digest_cache import DigestCache
 from abc import ABC
 
 
@@ -49,7 +74,39 @@ class RSAKeyPublic(RSAKey):
 
 
 class RSAKeyPrivate(RSAKey):
-    pass
+    def __init__(
+        self,
+        key: int,
+        modulus: int,
+        id: Optional[str] = None,
+        p: Optional[int] = None,
+        q: Optional[int] = None,
+    ) -> None:
+        """Create a new instance.
+
+        Parameters
+        ==========
+        id:
+            cannot have white space at its ends or be an empty string.
+
+        p, q:
+            prime factors of the modulus. If given, private key operations
+            use Chinese Remainder Theorem, which is several times faster.
+            Keys without them (e.g. read from older files) still work.
+        """
+        super().__init__(key, modulus, id)
+        if (p is None) != (q is None):
+            raise ValueError("Both `p` and `q` must be given, or none.")
+        if p is not None and q is not None:
+            if p * q != modulus:
+                raise ValueError("`p` * `q` must be equal to `modulus`.")
+            self.d_p: Optional[int] = key % (p - 1)
+            self.d_q: Optional[int] = key % (q - 1)
+            self.q_inv: Optional[int] = pow(q, -1, p)
+        else:
+            self.d_p = self.d_q = self.q_inv = None
+        self.p = p
+        self.q = q
 
 
 @dataclass
@@ -58,7 +115,16 @@ class RSAKeyPair:
     private: RSAKeyPrivate
 
 
-def rsa_key_gen(N: int) -> RSAKeyPair:
+# Public exponent used by default. It is prime, and has only two bits set,
+# so verification takes 17 modular multiplications.
+DEFAULT_PUBLIC_EXPONENT = 65537
+
+
+def rsa_key_gen(
+    N: int,
+    workers: Optional[int] = None,
+    public_exponent: Optional[int] = DEFAULT_PUBLIC_EXPONENT,
+) -> RSAKeyPair:
     """Generate RSA key pair.
 
     Takes number `N` and returns RSAKeyPair with (2 * N)-bit modulus.
@@ -67,33 +133,62 @@ def rsa_key_gen(N: int) -> RSAKeyPair:
     ==========
     `N`
     : determines the strength of the protocol.
+
+    workers
+    : if given, primes are searched for in parallel by this number of
+    worker processes. It pays off for large keys only, as starting the
+    processes takes time. Default: None (search in the calling process).
+
+    public_exponent
+    : fixed public exponent `e`; the private one is derived from it. Small
+    `e` makes verification much faster than signing. Must be odd and greater
+    than 1. If None, random private exponent is chosen, and the public one
+    is as large as the modulus. Default: 65537.
     """
-    p, q = find_prime(N), find_prime(N)
-    while p == q:  # make sure that p!=q
-        q = find_prime(N)
+    e = public_exponent
+    if e is not None and (e <= 1 or e % 2 == 0):
+        raise ValueError("`public_exponent` must be odd and greater than 1.")
+
+    # `e` must be invertible modulo phi, so primes p with gcd(e, p-1) != 1
+    # are rejected
+    if workers is None:
+        p, q = find_prime(N, coprime_to=e), find_prime(N, coprime_to=e)
+        while p == q:  # make sure that p!=q
+            q = find_prime(N, coprime_to=e)
+    else:
+        p, q = find_primes(N, 2, workers, coprime_to=e)
     n = p * q
     phi = (p - 1) * (q - 1)
-    d = phi
-    while math.gcd(phi, d) != 1:
-        d = secrets.randbelow(phi - 2) + 2  # rand d in range 2, 3,..., phi-1
-    e = pow(d, -1, phi)
+    if e is None:
+        d = phi
+        while math.gcd(phi, d) != 1:
+            # rand d in range 2, 3,..., phi-1
+            d = secrets.randbelow(phi - 2) + 2
+        e = pow(d, -1, phi)
+    else:
+        d = pow(e, -1, phi)
 
     public_key = RSAKeyPublic(e, n)
-    private_key = RSAKeyPrivate(d, n)
+    private_key = RSAKeyPrivate(d, n, p=p, q=q)
 
     return RSAKeyPair(public_key, private_key)
 
 
 def save_key(key: RSAKey, path: Path) -> Path:
-    """Save RSA key to the file."""
+    """Save RSA key to the file.
+
+    Prime factors of the modulus of a private key are saved after its id, so
+    the file can still be read by older versions.
+    """
     kind = key.__class__.__name__
     header = f"-----BEGIN {kind} KEY-----"
     footer = f"-----END {kind} KEY-----"
     # TODO: Consider serialization method allowing white space in `RSAKey.id`. Is
     # it needed?
-    contents = "\n".join(
-        (header, str(key.key), str(key.modulus), str(key.id), footer)
-    )
+    lines = [header, str(key.key), str(key.modulus), str(key.id)]
+    if isinstance(key, RSAKeyPrivate) and key.p is not None:
+        lines += [str(key.p), str(key.q)]
+    contents = "\n".join(lines + [footer])
 
     path.write_text(contents, encoding="utf8")
 
@@ -111,7 +206,18 @@ def read_key(path: Path, key_type: Type[RSAKeyVar]) -> RSAKeyVar:
         key = file.readline().strip()
         modulus = file.readline().strip()
         id = file.readline().strip()
-
+        # Prime factors of private key, followed by the footer, or just the
+        # footer in older files.
+        factors = [line.strip() for line in file if not line.startswith("-")]
+
+    if issubclass(key_type, RSAKeyPrivate) and len(factors) == 2:
+        return key_type(
+            key=int(key),
+            modulus=int(modulus),
+            id=str(id) if id != "None" else None,
+            p=int(factors[0]),
+            q=int(factors[1]),
+        )
     return key_type(
         key=int(key),
         modulus=int(modulus),
@@ -119,6 +225,65 @@ def read_key(path: Path, key_type: Type[RSAKeyVar]) -> RSAKeyVar:
     )
 
 
+def _rsa_private(message: int, key: RSAKeyPrivate) -> int:
+    """Returns `message` raised to the private exponent modulo `modulus`.
+
+    Uses Chinese Remainder Theorem (Garner's formula) if prime factors of the
+    modulus are known: two exponentiations with half-size numbers are several
+    times faster than one with the full modulus.
+    """
+    if key.p is None or key.q is None:
+        return pow(message, key.key, key.modulus)
+    assert key.d_p is not None and key.d_q is not None
+    assert key.q_inv is not None
+    m_p = pow(message, key.d_p, key.p)
+    m_q = pow(message, key.d_q, key.q)
+    h = key.q_inv * (m_p - m_q) % key.p
+    return m_q + h * key.q
+
+
+def rsa_sign_digest(digest: bytes, key: RSAKeyPrivate) -> str:
+    """
+    Function returns a digital signature of message digest computed earlier,
+    e.g. with `MD4.from_bytes(message).digest` or taken from a cache, so the
+    message isn't hashed again.
+
+    Parameters
+    ==========
+    digest
+    : message digest as bytes
+
+    key
+    : RSA private key
+    """
+    signature = _rsa_private(int.from_bytes(digest, "big"), key)
+    return hex(signature)[2:]
+
+
+def rsa_verify_digest(
+    digest: bytes, signature: str, key: RSAKeyPublic
+) -> bool:
+    """
+    Function verifies digital signature of message digest computed earlier.
+    It compares decoded signature with the digest
+    and returns True if they are the same, otherwise False.
+
+    Parameters
+    ==========
+    digest
+    : message digest as bytes
+
+    signature
+    : signature for verification
+
+    key
+    : RSA public key
+    """
+    hashed = int.from_bytes(digest, "big") % key.modulus
+    uncoded = pow(int(signature, 16), key.key, key.modulus)
+    return hashed == uncoded
+
+
 def rsa_sign(
     message: str, key: RSAKeyPrivate, algorithm: Type[Union[MD4, MD5]] = MD4
 ) -> str:
@@ -137,14 +302,15 @@ def rsa_sign(
     : hash method. Default: MD4.
     Available algorithms: MD4, MD5.
     """
-    hashed: Any = algorithm.from_bytes(message.encode("utf-8")).string_digest()
-    hashed = int(hashed, 16)
-    signature = pow(hashed, key.key, key.modulus)
-    return hex(signature)[2:]
+    digest = algorithm.from_bytes(message.encode("utf-8")).digest
+    return rsa_sign_digest(digest, key)
 
 
 def rsa_sign_file(
-    filename: str, key: RSAKeyPrivate, algorithm: Type[Union[MD4, MD5]] = MD4
+    filename: str,
+    key: RSAKeyPrivate,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    cache: Optional[DigestCache] = None,
 ) -> str:
     """
     Function returns a digital singnature based on the RSA protocol.
@@ -160,11 +326,12 @@ def rsa_sign_file(
     algorithm
     : hash method. Default: MD4.
     Available algorithms: MD4, MD5.
+
+    cache
+    : cache of file digests, consulted before hashing the file. Default: None.
     """
-    hashed: Any = algorithm.from_file(filename).string_digest()
-    hashed = int(hashed, 16)
-    signature = pow(hashed, key.key, key.modulus)
-    return hex(signature)[2:]
+    digest = algorithm.from_file(filename, cache=cache).digest
+    return rsa_sign_digest(digest, key)
 
 
 def rsa_verify(
@@ -194,12 +361,8 @@ def rsa_verify(
     Available algorithms: MD4, MD5.
 
     """
-    hashed: Any = algorithm.from_bytes(message.encode("utf-8")).string_digest()
-    hashed = int(hashed, 16) % key.modulus
-    uncoded = pow(int(signature, 16), key.key, key.modulus)
-    if hashed == uncoded:
-        return True
-    return False
+    digest = algorithm.from_bytes(message.encode("utf-8")).digest
+    return rsa_verify_digest(digest, signature, key)
 
 
 def rsa_verify_file(
@@ -207,6 +370,7 @@ def rsa_verify_file(
     signature: str,
     key: RSAKeyPublic,
     algorithm: Type[Union[MD4, MD5]] = MD4,
+    cache: Optional[DigestCache] = None,
 ):
     """
     Function verifies digital singnature of a message basing on the RSA protocol.
@@ -228,10 +392,296 @@ def rsa_verify_file(
     : hash algorithm. Default: MD4.
     Available algorithms: MD4, MD5.
 
+    cache
+    : cache of file digests, consulted before hashing the file. Default: None.
+
     """
-    hashed: Any = algorithm.from_file(filename).string_digest()
-    hashed = int(hashed, 16) % key.modulus
-    uncoded = pow(int(signature, 16), key.key, key.modulus)
-    if hashed == uncoded:
-        return True
-    return False
+    digest = algorithm.from_file(filename, cache=cache).digest
+    return rsa_verify_digest(digest, signature, key)
+
+
+# Number of messages verified by single task of `rsa_verify_many`, so that
+# the cost of sending them to worker process is amortized.
+_MESSAGES_PER_TASK = 256
+
+_Task = TypeVar("_Task")
+_Result = TypeVar("_Result")
+
+
+def _bounded_map(
+    function: Callable[[_Task], _Result],
+    tasks: Iterable[_Task],
+    workers: Optional[int],
+    ordered: bool = True,
+) -> Generator[_Result, None, None]:
+    """Run `function` on `tasks` in worker processes, yielding results in
+    order of `tasks`, or in order of completion if `ordered` is False.
+
+    At most two tasks per worker are submitted ahead of the results consumed
+    by the caller, so memory use is bounded even for very long `tasks`.
+    Remaining tasks are cancelled when the generator is closed early, or
+    a task raises an exception.
+    """
+    window = 2 * (workers or os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            queue: Deque[Future] = deque()
+            for task in tasks:
+                queue.append(executor.submit(function, task))
+                if len(queue) >= window:
+                    yield queue.popleft().result()
+            while queue:
+                yield queue.popleft().result()
+        else:
+            pending: Set[Future] = set()
+            for task in tasks:
+                pending.add(executor.submit(function, task))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _batches(
+    items: Iterable[Tuple[str, str]], size: int
+) -> Iterator[List[Tuple[str, str]]]:
+    """Split `items` into lists of `size` items, except the last one."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _signature_matches(
+    digest: bytes, signature: str, key: RSAKeyPublic
+) -> bool:
+    """Like `rsa_verify_digest`, but malformed signatures don't match."""
+    try:
+        return rsa_verify_digest(digest, signature, key)
+    except ValueError:
+        return False
+
+
+def _verify_messages(
+    items: List[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]],
+) -> List[bool]:
+    """Verify (message, signature) pairs. Run in worker processes."""
+    return [
+        _signature_matches(
+            algorithm.from_bytes(message.encode("utf-8")).digest,
+            signature,
+            key,
+        )
+        for message, signature in items
+    ]
+
+
+def _verify_file(
+    item: Tuple[str, str],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]],
+) -> bool:
+    """Verify (path, signature) pair. Run in worker processes."""
+    filename, signature = item
+    try:
+        digest = algorithm.from_file(filename).digest
+    except OSError:
+        return False
+    return _signature_matches(digest, signature, key)
+
+
+def _verify_many(
+    items: Iterable[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]],
+    workers: Optional[int],
+    files: bool,
+) -> Generator[bool, None, None]:
+    """Verify (message or path, signature) pairs in worker processes,
+    yielding results in order of `items`."""
+    if files:
+        yield from _bounded_map(
+            partial(_verify_file, key=key, algorithm=algorithm),
+            items,
+            workers,
+        )
+    else:
+        for results in _bounded_map(
+            partial(_verify_messages, key=key, algorithm=algorithm),
+            _batches(items, _MESSAGES_PER_TASK),
+            workers,
+        ):
+            yield from results
+
+
+def _verify_all(results: Generator[bool, None, None]) -> bool:
+    """Check if all the `results` are True, stopping at the first False."""
+    try:
+        return all(results)
+    finally:
+        # cancel verification of the remaining items
+        results.close()
+
+
+def rsa_verify_many(
+    items: Iterable[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+) -> Iterator[bool]:
+    """
+    Function verifies digital signatures of many messages signed with the
+    same key, hashing them in worker processes. It yields True for each valid
+    signature and False otherwise, in order of `items`.
+
+    Items are consumed lazily, so they can be produced while earlier ones are
+    verified. Malformed signatures are reported as invalid.
+
+    Parameters
+    ==========
+    items
+    : (message, signature) pairs
+
+    key
+    : RSA public key
+
+    algorithm
+    : hash algorithm. Default: MD4.
+    Available algorithms: MD4, MD5.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    return _verify_many(items, key, algorithm, workers, files=False)
+
+
+def rsa_verify_files(
+    items: Iterable[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+) -> Iterator[bool]:
+    """
+    Function verifies digital signatures of many files signed with the same
+    key, hashing them in worker processes. It yields True for each valid
+    signature and False otherwise, in order of `items`.
+
+    Items are consumed lazily, so they can be produced while earlier ones are
+    verified. Malformed signatures and files which cannot be read are
+    reported as invalid.
+
+    Parameters
+    ==========
+    items
+    : (path, signature) pairs
+
+    key
+    : RSA public key
+
+    algorithm
+    : hash algorithm. Default: MD4.
+    Available algorithms: MD4, MD5.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    return _verify_many(items, key, algorithm, workers, files=True)
+
+
+def rsa_verify_all(
+    items: Iterable[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+) -> bool:
+    """
+    Function returns True if all the signatures of messages are valid, like
+    `all(rsa_verify_many(...))`, but verification of the remaining items is
+    cancelled as soon as an invalid signature is found.
+
+    Parameters are the same as of `rsa_verify_many`.
+    """
+    return _verify_all(
+        _verify_many(items, key, algorithm, workers, files=False)
+    )
+
+
+def rsa_verify_files_all(
+    items: Iterable[Tuple[str, str]],
+    key: RSAKeyPublic,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+) -> bool:
+    """
+    Function returns True if all the signatures of files are valid, like
+    `all(rsa_verify_files(...))`, but verification of the remaining items is
+    cancelled as soon as an invalid signature is found.
+
+    Parameters are the same as of `rsa_verify_files`.
+    """
+    return _verify_all(
+        _verify_many(items, key, algorithm, workers, files=True)
+    )
+
+
+def _sign_file(
+    filename: str,
+    key: RSAKeyPrivate,
+    algorithm: Type[Union[MD4, MD5]],
+) -> FileResult[str]:
+    """Returns signature of file, or error which prevented signing it. Run in
+    worker processes."""
+    try:
+        return FileResult(filename, rsa_sign_file(filename, key, algorithm))
+    except Exception as error:
+        return FileResult(filename, None, error)
+
+
+def rsa_sign_files(
+    paths: Iterable[str],
+    key: RSAKeyPrivate,
+    algorithm: Type[Union[MD4, MD5]] = MD4,
+    workers: Optional[int] = None,
+    ordered: bool = False,
+) -> Iterator[FileResult[str]]:
+    """
+    Function signs many files with the same key. Files are hashed and signed
+    in worker processes, and results are yielded as soon as they are ready.
+
+    Paths are consumed lazily, and only a few files per worker are processed
+    ahead of the results consumed by the caller, so memory use is bounded.
+    Signatures are values of the results.
+
+    Parameters
+    ==========
+    paths
+    : paths to existing files to sign
+
+    key
+    : RSA private key
+
+    algorithm
+    : hash method. Default: MD4.
+    Available algorithms: MD4, MD5.
+
+    workers
+    : number of worker processes. Default: number of processors.
+
+    ordered
+    : if True, results are yielded in order of `paths`, otherwise in order
+    of completion. Default: False.
+    """
+    return _bounded_map(
+        partial(_sign_file, key=key, algorithm=algorithm),
+        paths,
+        workers,
+        ordered,
+    )
@@ -0,0 +1,149 @@
+"""Tree mode hashing, which lets many processes hash single file.
+
+The file is divided into leaves of fixed size, each of which is hashed
+separately, and the root digest is digest of concatenated leaf digests. It
+differs from standard MD4/MD5 digest of the file, but can be computed in
+parallel, and allows to point out corrupted parts of the file.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Type, Union
+from .md4 import MD4
+from .md5 import MD5
+
+DEFAULT_LEAF_SIZE = 1 << 26  # 64 MiB
+
+_ALGORITHMS: Dict[str, Type[Union[MD4, MD5]]] = {
+    MD4.name: MD4,
+    MD5.name: MD5,
+}
+
+
+@dataclass
+class TreeDigest:
+    """Digests of all the leaves of a file."""
+
+    algorithm: Type[Union[MD4, MD5]]
+    leaf_size: int
+    file_size: int
+    leaves: List[bytes]
+
+    @property
+    def digest(self) -> bytes:
+        """The root digest as bytes."""
+        return self.algorithm.from_bytes(b"".join(self.leaves)).digest
+
+    def string_digest(self) -> str:
+        """Returns string representation of the root digest."""
+        return self.digest.hex()
+
+
+def _hash_leaf(
+    filename: str, algorithm: Type[Union[MD4, MD5]], offset: int, size: int
+) -> bytes:
+    """Returns digest of `size` bytes of file starting at `offset`. Run in
+    worker processes."""
+    md = algorithm()
+    with open(filename, "rb") as file:
+        file.seek(offset)
+        md.update_from_file(file, limit=size)
+    return md.digest
+
+
+def tree_digest(
+    filename: str,
+    algorithm: Type[Union[MD4, MD5]] = MD5,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+    workers: Optional[int] = None,
+) -> TreeDigest:
+    """Compute tree digest of file, hashing its leaves in parallel.
+
+    Parameters
+    ==========
+    filename
+    : path to existing file whose digest is to be computed.
+
+    algorithm
+    : hash algorithm. Default: MD5.
+    Available algorithms: MD4, MD5.
+
+    leaf_size
+    : size of single leaf in bytes. Must be positive. Default: 64 MiB.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    if leaf_size <= 0:
+        raise ValueError("`leaf_size` must be positive.")
+    file_size = os.path.getsize(filename)
+    # empty file still has single (empty) leaf
+    offsets = range(0, max(file_size, 1), leaf_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        leaves = list(
+            executor.map(
+                _hash_leaf,
+                [filename] * len(offsets),
+                [algorithm] * len(offsets),
+                offsets,
+                [leaf_size] * len(offsets),
+            )
+        )
+    return TreeDigest(algorithm, leaf_size, file_size, leaves)
+
+
+def save_tree_digest(tree: TreeDigest, path: Path) -> Path:
+    """Save leaf digests to the sidecar file.
+
+    First line contains algorithm name, leaf size and file size, and each of
+    the following lines contains digest of single leaf.
+    """
+    header = f"{tree.algorithm.name} {tree.leaf_size} {tree.file_size}"
+    contents = "\n".join([header] + [leaf.hex() for leaf in tree.leaves])
+    path.write_text(contents + "\n", encoding="utf8")
+    return path
+
+
+def read_tree_digest(path: Path) -> TreeDigest:
+    """Read leaf digests from the sidecar file."""
+    lines = path.read_text("utf8").splitlines()
+    name, leaf_size, file_size = lines[0].split()
+    return TreeDigest(
+        algorithm=_ALGORITHMS[name],
+        leaf_size=int(leaf_size),
+        file_size=int(file_size),
+        leaves=[bytes.fromhex(line) for line in lines[1:]],
+    )
+
+
+def verify_tree_digest(
+    filename: str, tree: TreeDigest, workers: Optional[int] = None
+) -> List[int]:
+    """Check file against its tree digest.
+
+    Returns sorted indices of leaves which differ, so empty list means that
+    the file is intact. If size of the file changed, leaves which were added
+    or removed are also reported.
+
+    Parameters
+    ==========
+    filename
+    : path to existing file to be checked.
+
+    tree
+    : tree digest computed earlier, e.g. read with `read_tree_digest`.
+
+    workers
+    : number of worker processes. Default: number of processors.
+    """
+    current = tree_digest(filename, tree.algorithm, tree.leaf_size, workers)
+    leaves_no = max(len(current.leaves), len(tree.leaves))
+    return [
+        idx
+        for idx in range(leaves_no)
+        if idx >= len(current.leaves)
+        or idx >= len(tree.leaves)
+        or current.leaves[idx] != tree.leaves[idx]
+    ]
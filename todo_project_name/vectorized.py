@@ -0,0 +1,227 @@
+"""Computing message digests of many short messages at once.
+
+Messages are processed simultaneously, each in its own lane of NumPy array,
+so the interpreter overhead is paid once per step of the algorithm instead of
+once per message. It pays off for large number of messages (thousands or
+more), and requires NumPy, which is optional dependency of this package,
+installed with the `vectorized` extra.
+"""
+
+import struct
+from typing import Callable, Dict, List, Sequence
+from .md4 import MD4
+from .md5 import MD5
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+# Per-step tables of MD4: index of message word, shift and additive constant.
+# They are the same as in `MD4._update_reference`.
+_MD4_INDICES = (
+    list(range(16))
+    + [0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15]
+    + [0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15]
+)
+_MD4_SHIFTS = [3, 7, 11, 19] * 4 + [3, 5, 9, 13] * 4 + [3, 9, 11, 15] * 4
+_MD4_K = [0] * 16 + [MD4.ROUND_2] * 16 + [MD4.ROUND_3] * 16
+
+# Per-step tables of MD5: index of message word, shift and additive constant.
+# They are the same as in `MD5._update_reference`.
+_MD5_INDICES = (
+    [k for k in range(16)]
+    + [(1 + 5 * k) % 16 for k in range(16)]
+    + [(5 + 3 * k) % 16 for k in range(16)]
+    + [(7 * k) % 16 for k in range(16)]
+)
+_MD5_SHIFTS = (
+    [7, 12, 17, 22] * 4
+    + [5, 9, 14, 20] * 4
+    + [4, 11, 16, 23] * 4
+    + [6, 10, 15, 21] * 4
+)
+_MD5_T = MD5.T
+
+
+def _require_numpy() -> None:
+    """Raise ImportError with helpful message if NumPy is not installed."""
+    if np is None:
+        raise ImportError(
+            "Vectorized hashing requires NumPy. Install it with the "
+            "`vectorized` extra, e.g. `poetry install --extras vectorized`."
+        )
+
+
+def _pad(message: bytes) -> bytes:
+    """Returns message padded according to MD4/MD5 specification, ready to be
+    divided into 64-byte blocks."""
+    add = (55 - len(message)) % 64 + 1  # at least one byte: 0x80
+    return (
+        message
+        + b"\x80"
+        + bytes(add - 1)
+        + struct.pack("<Q", (len(message) * 8) & 0xFFFFFFFFFFFFFFFF)
+    )
+
+
+def _buckets(messages: Sequence[bytes]) -> Dict[int, List[int]]:
+    """Group indices of messages by number of blocks after padding, so that
+    each group can be processed as single rectangular array."""
+    buckets: Dict[int, List[int]] = {}
+    for idx, message in enumerate(messages):
+        blocks_no = len(message) // 64 + (1 if len(message) % 64 < 56 else 2)
+        buckets.setdefault(blocks_no, []).append(idx)
+    return buckets
+
+
+def _md4_lanes(words: "np.ndarray") -> "np.ndarray":
+    """Run MD4 on messages already padded and converted to words.
+
+    Parameters
+    ==========
+    words
+    : array of shape (messages, blocks, 16) of dtype uint32.
+
+    Returns array of shape (messages, 4) with final registers A, B, C, D.
+    """
+    lanes = words.shape[0]
+    A: "np.ndarray" = np.full(lanes, 0x67452301, dtype=np.uint32)
+    B: "np.ndarray" = np.full(lanes, 0xEFCDAB89, dtype=np.uint32)
+    C: "np.ndarray" = np.full(lanes, 0x98BADCFE, dtype=np.uint32)
+    D: "np.ndarray" = np.full(lanes, 0x10325476, dtype=np.uint32)
+
+    for block in range(words.shape[1]):
+        # columns of contiguous array are faster to read
+        X = np.ascontiguousarray(words[:, block, :].T)
+        a, b, c, d = A, B, C, D
+        for i in range(48):
+            if i < 16:
+                f = (b & c) | (~b & d)
+            elif i < 32:
+                f = (b & c) | ((b | c) & d)
+            else:
+                f = b ^ c ^ d
+            s = _MD4_SHIFTS[i]
+            f += a
+            f += X[_MD4_INDICES[i]]
+            if _MD4_K[i]:
+                f += np.uint32(_MD4_K[i])
+            a, d, c = d, c, b
+            b = (f << s) | (f >> (32 - s))
+        A = A + a
+        B = B + b
+        C = C + c
+        D = D + d
+
+    return np.stack([A, B, C, D], axis=1)
+
+
+def _md5_lanes(words: "np.ndarray") -> "np.ndarray":
+    """Run MD5 on messages already padded and converted to words.
+
+    Parameters
+    ==========
+    words
+    : array of shape (messages, blocks, 16) of dtype uint32.
+
+    Returns array of shape (messages, 4) with final registers A, B, C, D.
+    """
+    lanes = words.shape[0]
+    A: "np.ndarray" = np.full(lanes, 0x67452301, dtype=np.uint32)
+    B: "np.ndarray" = np.full(lanes, 0xEFCDAB89, dtype=np.uint32)
+    C: "np.ndarray" = np.full(lanes, 0x98BADCFE, dtype=np.uint32)
+    D: "np.ndarray" = np.full(lanes, 0x10325476, dtype=np.uint32)
+
+    for block in range(words.shape[1]):
+        # columns of contiguous array are faster to read
+        X = np.ascontiguousarray(words[:, block, :].T)
+        a, b, c, d = A, B, C, D
+        for i in range(64):
+            if i < 16:
+                f = (b & c) | (~b & d)
+            elif i < 32:
+                f = (b & d) | (c & ~d)
+            elif i < 48:
+                f = b ^ c ^ d
+            else:
+                f = c ^ (b | ~d)
+            s = _MD5_SHIFTS[i]
+            f += a
+            f += X[_MD5_INDICES[i]]
+            f += np.uint32(_MD5_T[i])
+            a, d, c = d, c, b
+            b = b + ((f << s) | (f >> (32 - s)))
+        A = A + a
+        B = B + b
+        C = C + c
+        D = D + d
+
+    return np.stack([A, B, C, D], axis=1)
+
+
+def _hash_many(
+    messages: Sequence[bytes],
+    lanes_function: Callable[["np.ndarray"], "np.ndarray"],
+) -> List[bytes]:
+    """Compute message digests of many messages at once.
+
+    Parameters
+    ==========
+    messages
+    : messages whose digests are to be computed.
+
+    lanes_function
+    : `_md4_lanes` or `_md5_lanes`.
+
+    Returns list of digests, in the same order as `messages`.
+    """
+    _require_numpy()
+    digests: List[bytes] = [b""] * len(messages)
+    for blocks_no, indices in _buckets(messages).items():
+        padded = b"".join(_pad(messages[idx]) for idx in indices)
+        words = np.frombuffer(padded, dtype="<u4").reshape(
+            len(indices), blocks_no, 16
+        )
+        registers = lanes_function(words.astype(np.uint32))
+        result = registers.astype("<u4").tobytes()
+        for lane, idx in enumerate(indices):
+            digests[idx] = result[16 * lane : 16 * lane + 16]
+    return digests
+
+
+def md4_many(messages: Sequence[bytes]) -> List[bytes]:
+    """Compute MD4 message digests of many messages at once.
+
+    Gives the same results as `MD4.from_bytes(message).digest` for each
+    message, but is much faster for large number of short messages. Messages
+    may have different lengths; they are processed in groups of equal number
+    of blocks.
+
+    Parameters
+    ==========
+    messages
+    : messages whose digests are to be computed.
+
+    Returns list of digests, in the same order as `messages`.
+    """
+    return _hash_many(messages, _md4_lanes)
+
+
+def md5_many(messages: Sequence[bytes]) -> List[bytes]:
+    """Compute MD5 message digests of many messages at once.
+
+    Gives the same results as `MD5.from_bytes(message).digest` for each
+    message, but is much faster for large number of short messages. Messages
+    may have different lengths; they are processed in groups of equal number
+    of blocks.
+
+    Parameters
+    ==========
+    messages
+    : messages whose digests are to be computed.
+
+    Returns list of digests, in the same order as `messages`.
+    """
+    return _hash_many(messages, _md5_lanes)